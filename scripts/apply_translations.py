@@ -6,8 +6,12 @@
 
 import re
 import os
+import argparse
 from pathlib import Path
 
+from atomic_output import STATS, write_text_if_changed
+from page_discovery import add_parallel_arguments, discover_sources, run_parallel, source_id
+
 # 目標頁面列表
 TARGET_PAGES = [
     'WhereToBuy',
@@ -28,6 +32,7 @@ TARGET_PAGES = [
 
 # 頁面路徑
 PAGES_DIR = Path('/home/ubuntu/apolnus/client/src/pages')
+SRC_DIR = PAGES_DIR.parent
 
 # 頁面對應的翻譯 key 和 SEO key
 PAGE_CONFIG = {
@@ -160,9 +165,9 @@ def extract_translation_key(text, page_key):
     
     return f'{page_key}.{key}'
 
-def process_page(page_name):
+def process_page(page_name, page_file=None):
     """處理單個頁面"""
-    page_file = PAGES_DIR / f'{page_name}.tsx'
+    page_file = page_file or PAGES_DIR / f'{page_name}.tsx'
     
     if not page_file.exists():
         print(f'⚠️  頁面不存在: {page_name}')
@@ -173,15 +178,13 @@ def process_page(page_name):
     # 讀取檔案
     with open(page_file, 'r', encoding='utf-8') as f:
         content = f.read()
+    original_content = content
     
-    # 備份原始檔案
-    backup_file = page_file.with_suffix('.tsx.backup')
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f'   ✅ 備份原始檔案: {backup_file.name}')
+    # --all 模式下 page_name 為 pages/admin/AdminJobs 這類相對路徑
+    base_name = Path(page_name).name
     
     # 添加 imports
-    content = add_imports(content, page_name)
+    content = add_imports(content, base_name)
     print(f'   ✅ 添加必要的 imports')
     
     # 添加 useTranslation hook
@@ -189,39 +192,62 @@ def process_page(page_name):
     print(f'   ✅ 添加 useTranslation hook')
     
     # 添加 SEOHead 組件
-    content = add_seo_head(content, page_name)
+    content = add_seo_head(content, base_name)
     print(f'   ✅ 添加 SEOHead 組件')
     
+    if content == original_content:
+        print(f'   ℹ️  頁面沒有變更，略過寫入')
+        return True
+    
+    # 備份原始檔案（只有頁面真的會被修改時才備份）
+    backup_file = page_file.with_suffix('.tsx.backup')
+    write_text_if_changed(backup_file, original_content)
+    print(f'   ✅ 備份原始檔案: {backup_file.name}')
+    
     # 保存修改後的檔案
-    with open(page_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    write_text_if_changed(page_file, content)
     
     print(f'   ✅ 頁面處理完成')
     
     return True
 
+def _process_job(job):
+    """process pool 的工作單元：(page_name, page_file)"""
+    return process_page(*job)
+
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='批次整合所有頁面的翻譯和 SEO')
+    add_parallel_arguments(parser)
+    args = parser.parse_args()
+    
     print('🚀 開始批次處理所有頁面...\n')
     print('=' * 60)
     
     success_count = 0
     failed_count = 0
     
-    for page_name in TARGET_PAGES:
-        try:
-            if process_page(page_name):
-                success_count += 1
-            else:
-                failed_count += 1
-        except Exception as e:
-            print(f'❌ 處理 {page_name} 時發生錯誤: {str(e)}')
+    if args.all:
+        targets = [(source_id(path, SRC_DIR), path) for path in discover_sources(SRC_DIR)]
+    else:
+        targets = [(page_name, None) for page_name in TARGET_PAGES]
+    
+    for outcome in run_parallel(_process_job, targets, args.workers):
+        page_name = outcome.item[0]
+        print(outcome.output, end='')
+        if outcome.error:
+            print(f'❌ 處理 {page_name} 時發生錯誤: {outcome.error.strip().splitlines()[-1]}')
+            failed_count += 1
+        elif outcome.result:
+            success_count += 1
+        else:
             failed_count += 1
     
     print('\n' + '=' * 60)
     print(f'\n✅ 批次處理完成！')
     print(f'📊 成功: {success_count} 個頁面')
     print(f'📊 失敗: {failed_count} 個頁面')
+    print(STATS.summary())
     print(f'\n💡 提示: 原始檔案已備份為 .tsx.backup')
     print(f'💡 如需還原，請執行: rm *.tsx && mv *.tsx.backup *.tsx')
 
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+共用的檔案輸出層
+內容與磁碟上的檔案完全相同時不寫入（避免觸發 Vite 重新編譯與建置快取失效）
+需要寫入時先寫到同目錄的暫存檔再 rename，中途失敗也不會留下寫了一半的檔案
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List
+
+
+class OutputStats:
+    """本 process 寫入與略過的檔案"""
+
+    def __init__(self):
+        self.touched: List[str] = []
+        self.skipped: List[str] = []
+
+    def snapshot(self) -> tuple:
+        return len(self.touched), len(self.skipped)
+
+    def since(self, snapshot: tuple) -> tuple:
+        """snapshot 之後新增的紀錄（給 process pool 回傳給主程序）"""
+        touched, skipped = snapshot
+        return self.touched[touched:], self.skipped[skipped:]
+
+    def merge(self, delta: tuple):
+        touched, skipped = delta
+        self.touched.extend(touched)
+        self.skipped.extend(skipped)
+
+    def summary(self) -> str:
+        return f'💾 寫入 {len(self.touched)} 個檔案，略過 {len(self.skipped)} 個未變更的檔案'
+
+
+STATS = OutputStats()
+
+
+def _unchanged(path: Path, data: bytes) -> bool:
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def write_bytes_if_changed(path, data: bytes) -> bool:
+    """內容有變更才寫入，回傳是否寫入"""
+    path = Path(path)
+    if _unchanged(path, data):
+        STATS.skipped.append(str(path))
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            # 先確定內容落地再 rename，斷電時不會留下已改名但內容是空的檔案
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        else:
+            # mkstemp 建立的檔案權限是 0600，改回一般檔案的預設權限
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    STATS.touched.append(str(path))
+    return True
+
+
+def write_text_if_changed(path, content: str) -> bool:
+    return write_bytes_if_changed(path, content.encode('utf-8'))
+
+
+def write_json_if_changed(path, data, indent=2, **kwargs) -> bool:
+    """與 json.dump(data, f, ensure_ascii=False, indent=2) 產生相同內容"""
+    kwargs.setdefault('ensure_ascii', False)
+    return write_text_if_changed(path, json.dumps(data, indent=indent, **kwargs))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+依 token 預算規劃 LLM 翻譯批次
+估算每個項目的輸入/輸出 token，依序裝箱到預算上限：短的 UI 文字合併成少數大批次，長篇法律條文不會爆量
+單一項目超過預算時依段落/句子拆開（沒有標點的長句再依字數硬切），翻譯後再接回
+模型輸出被截斷（finish_reason=length）時預算減半重新規劃，之後每個順利完成的批次再逐步加回，直到原本設定的預算
+"""
+
+import json
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+_CJK_RE = re.compile('[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\u3000-\u303f\uff00-\uffef]')
+# 拆分長文：段落結尾或句尾標點之後
+_SEGMENT_RE = re.compile(r'[^\n。！？!?]*(?:[。！？!?]+\n*|\n+|$)')
+
+# 拆開的項目以 key::序號 送出
+PART_SEP = '::'
+
+DEFAULT_TOKEN_BUDGET = 2000
+DEFAULT_MAX_ITEMS = 60
+MIN_TOKEN_BUDGET = 200
+# 批次順利完成時預算加回的量
+GROW_STEP = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """粗估 token 數：中日韓字元約 1 字 1 token，其餘約 4 字元 1 token"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class Estimate(NamedTuple):
+    requests: int
+    input_tokens: int
+    output_tokens: int
+
+    def __add__(self, other):
+        return Estimate(*(a + b for a, b in zip(self, other)))
+
+    def describe(self) -> str:
+        return (f'{self.requests} 個請求，約 {self.input_tokens:,} 輸入 token、'
+                f'{self.output_tokens:,} 輸出 token')
+
+
+class BatchPlanner:
+    """
+    token_budget：每個請求「輸入 + 預估輸出」的 token 上限（不含固定的 prompt）
+    output_ratio：譯文 token 數相對於原文的倍率（繁中 → 歐語約 1.5）
+    prompt_tokens：每個請求固定的 system prompt 成本，只計入估算
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, max_items: int = DEFAULT_MAX_ITEMS,
+                 output_ratio: float = 1.5, prompt_tokens: int = 0, joiner: str = ' '):
+        self.token_budget = token_budget
+        self.max_budget = token_budget
+        self.max_items = max_items
+        self.output_ratio = output_ratio
+        self.prompt_tokens = prompt_tokens
+        self.joiner = joiner  # 譯文句子之間的接合字元（目標語言為中日文時用 ''）
+        # 被拆開的項目：{原 key: [(部分 key, 部分之後的分隔字元), ...]}
+        self.splits: Dict[str, List[Tuple[str, str]]] = {}
+
+    def item_cost(self, key: str, text: str) -> Tuple[int, int]:
+        """回傳 (輸入 token, 預估輸出 token)；key 與 JSON 引號在輸入、輸出各出現一次"""
+        if not isinstance(text, str):
+            # 巢狀物件整個以 JSON 送出
+            text = json.dumps(text, ensure_ascii=False)
+        overhead = estimate_tokens(key) + 4
+        text_tokens = estimate_tokens(text)
+        return text_tokens + overhead, int(text_tokens * self.output_ratio) + overhead
+
+    def _hard_split(self, key: str, text: str) -> List[str]:
+        """沒有段落/句子可切的長文，依字數切成不超過預算的片段（盡量切在空白之後）"""
+        pieces = []
+        while text:
+            # 二分搜尋放得進預算的最長前綴，至少 1 字
+            lo, hi = 1, len(text)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if sum(self.item_cost(key, text[:mid])) <= self.token_budget:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            cut = lo
+            if lo < len(text):
+                space = text.rfind(' ', 0, lo)
+                if space > 0:
+                    cut = space + 1
+            pieces.append(text[:cut])
+            text = text[cut:]
+        return pieces
+
+    def _split(self, key: str, text: str) -> List[Tuple[str, str]]:
+        """把超過預算的文字依段落/句子切成不超過預算的片段；單一句子仍超過預算時依字數硬切"""
+        # 片段以 key::序號 送出，以最長的序號估算
+        probe_key = f'{key}{PART_SEP}{len(text)}'
+        segments = []
+        for segment in _SEGMENT_RE.findall(text):
+            if not segment:
+                continue
+            if sum(self.item_cost(probe_key, segment)) > self.token_budget:
+                segments.extend(self._hard_split(probe_key, segment))
+            else:
+                segments.append(segment)
+        parts, current = [], ''
+        for segment in segments:
+            if current and sum(self.item_cost(probe_key, current + segment)) > self.token_budget:
+                parts.append(current)
+                current = ''
+            current += segment
+        if current:
+            parts.append(current)
+
+        layout = []
+        items = []
+        for i, part in enumerate(parts):
+            part_key = f'{key}{PART_SEP}{i}'
+            stripped = part.rstrip('\n')
+            layout.append((part_key, '\n' * (len(part) - len(stripped)) or self.joiner))
+            items.append((part_key, stripped))
+        self.splits[key] = layout
+        return items
+
+    def plan(self, text_map: Dict[str, str]) -> List[Dict[str, str]]:
+        """依序裝箱，回傳批次清單（每批為 {key: 原文}）"""
+        batches, current, used = [], {}, 0
+        for key, text in text_map.items():
+            cost = sum(self.item_cost(key, text))
+            oversized = cost > self.token_budget and isinstance(text, str)
+            items = self._split(key, text) if oversized else [(key, text)]
+            for item_key, item_text in items:
+                cost = sum(self.item_cost(item_key, item_text))
+                if current and (used + cost > self.token_budget or len(current) >= self.max_items):
+                    batches.append(current)
+                    current, used = {}, 0
+                current[item_key] = item_text
+                used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def estimate(self, batches: List[Dict[str, str]]) -> Estimate:
+        input_tokens = output_tokens = 0
+        for batch in batches:
+            input_tokens += self.prompt_tokens
+            for key, text in batch.items():
+                cost_in, cost_out = self.item_cost(key, text)
+                input_tokens += cost_in
+                output_tokens += cost_out
+        return Estimate(len(batches), input_tokens, output_tokens)
+
+    def merge_parts(self, translated: Dict[str, str]) -> Dict[str, str]:
+        """把拆開項目的譯文接回原 key；有任何片段缺漏的項目不輸出"""
+        merged = dict(translated)
+        # 重新規劃時片段可能再被拆開，由最後拆的開始接回
+        for key, layout in reversed(list(self.splits.items())):
+            if all(part_key in merged for part_key, _ in layout):
+                merged[key] = ''.join(
+                    merged[part_key] + (sep if i < len(layout) - 1 else '')
+                    for i, (part_key, sep) in enumerate(layout)
+                )
+        return {key: value for key, value in merged.items() if PART_SEP not in key}
+
+    def shrink(self) -> bool:
+        """模型輸出被截斷（finish_reason=length）時把預算減半，已到下限時回傳 False
+        只是缺少或不合格的 key 不代表批次太大，不要呼叫"""
+        if self.token_budget <= MIN_TOKEN_BUDGET:
+            return False
+        self.token_budget = max(MIN_TOKEN_BUDGET, self.token_budget // 2)
+        print(f'   📉 輸出被截斷，批次預算降為 {self.token_budget} token')
+        return True
+
+    def grow(self) -> bool:
+        """批次順利完成（沒有截斷）時把預算加回 GROW_STEP，已回到原本的預算時回傳 False"""
+        if self.token_budget >= self.max_budget:
+            return False
+        self.token_budget = min(self.max_budget, self.token_budget + GROW_STEP)
+        return True
+
+
+def missing_keys(batch: Dict[str, str], translated: Dict[str, str]) -> Dict[str, str]:
+    """批次中沒有拿到譯文的項目"""
+    return {key: text for key, text in batch.items() if translated.get(key) is None}
@@ -5,9 +5,15 @@
 """
 
 import re
-import json
+import sys
+import argparse
 from pathlib import Path
 
+from atomic_output import STATS, write_text_if_changed
+from locale_table import LocaleTable, escape_key, join_path
+from page_discovery import (add_parallel_arguments, discover_sources, find_namespace_collisions, page_path_parts,
+                            run_parallel, source_id)
+
 # 剩餘頁面列表
 REMAINING_PAGES = [
     'About',
@@ -25,14 +31,12 @@ REMAINING_PAGES = [
 ]
 
 PAGES_DIR = Path('/home/ubuntu/apolnus/client/src/pages')
+SRC_DIR = PAGES_DIR.parent
 TRANSLATIONS_DIR = Path('/home/ubuntu/apolnus/client/src/i18n/locales')
 
 # 載入現有翻譯
-with open(TRANSLATIONS_DIR / 'zh-TW.json', 'r', encoding='utf-8') as f:
-    zh_tw = json.load(f)
-
-with open(TRANSLATIONS_DIR / 'en.json', 'r', encoding='utf-8') as f:
-    en = json.load(f)
+zh_tw = LocaleTable.load(TRANSLATIONS_DIR / 'zh-TW.json')
+en = LocaleTable.load(TRANSLATIONS_DIR / 'en.json')
 
 def contains_chinese(text):
     """檢查是否包含中文"""
@@ -59,13 +63,26 @@ def extract_chinese_texts(content):
     
     return texts
 
-def process_page(page_name):
-    """處理單個頁面"""
-    page_file = PAGES_DIR / f'{page_name}.tsx'
+def page_namespace(page_name):
+    """
+    頁面的翻譯 namespace：依完整相對路徑組成 camelCase
+    About → about；pages/admin/AdminDealers → adminAdminDealers（與 pages/AdminDealers 的 adminDealers 不同）
+    """
+    parts = page_path_parts(page_name)
+    head, rest = parts[0], parts[1:]
+    return head[0].lower() + head[1:] + ''.join(part[0].upper() + part[1:] for part in rest)
+
+def process_page(page_name, page_file=None):
+    """
+    處理單個頁面，回傳 (page_key, translations_zh, translations_en)
+    翻譯不直接寫入 zh_tw / en，由主程序依路徑順序合併（子 process 的修改不會回傳）
+    頁面不存在時回傳 None
+    """
+    page_file = page_file or PAGES_DIR / f'{page_name}.tsx'
     
     if not page_file.exists():
         print(f'⚠️  頁面不存在: {page_name}')
-        return False
+        return None
     
     print(f'\n📄 處理頁面: {page_name}')
     
@@ -73,12 +90,17 @@ def process_page(page_name):
     with open(page_file, 'r', encoding='utf-8') as f:
         content = f.read()
     
+    # 生成翻譯 key 和內容（--all 模式下 page_name 為 pages/admin/AdminJobs 這類相對路徑）
+    page_key = page_namespace(page_name)
+    translations_zh = {}
+    translations_en = {}
+    
     # 提取中文文字
     chinese_texts = extract_chinese_texts(content)
     
     if not chinese_texts:
         print(f'   ℹ️  沒有找到中文文字')
-        return True
+        return page_key, translations_zh, translations_en
     
     # 去重並保持順序
     unique_texts = []
@@ -90,11 +112,6 @@ def process_page(page_name):
     
     print(f'   ✅ 找到 {len(unique_texts)} 個中文文字')
     
-    # 生成翻譯 key 和內容
-    page_key = page_name[0].lower() + page_name[1:]  # camelCase
-    translations_zh = {}
-    translations_en = {}
-    
     for i, text in enumerate(unique_texts, 1):
         key = f'p_{i:02d}'
         translations_zh[key] = text
@@ -117,49 +134,72 @@ def process_page(page_name):
         )
     
     # 保存修改後的檔案
-    with open(page_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    # 更新翻譯 JSON
-    zh_tw[page_key] = translations_zh
-    en[page_key] = translations_en
+    write_text_if_changed(page_file, content)
     
     print(f'   ✅ 頁面處理完成，生成 {len(translations_zh)} 個翻譯 key')
     
-    return True
+    return page_key, translations_zh, translations_en
+
+def _process_job(job):
+    """process pool 的工作單元：(page_name, page_file)"""
+    return process_page(*job)
 
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='批次處理所有剩餘頁面')
+    add_parallel_arguments(parser)
+    args = parser.parse_args()
+    
     print('🚀 開始批次處理所有剩餘頁面...\n')
     print('=' * 60)
     
     success_count = 0
     failed_count = 0
     
-    for page_name in REMAINING_PAGES:
-        try:
-            if process_page(page_name):
-                success_count += 1
-            else:
-                failed_count += 1
-        except Exception as e:
-            print(f'❌ 處理 {page_name} 時發生錯誤: {str(e)}')
-            import traceback
-            traceback.print_exc()
+    if args.all:
+        targets = [(source_id(path, SRC_DIR), path) for path in discover_sources(SRC_DIR)]
+    else:
+        targets = [(page_name, None) for page_name in REMAINING_PAGES]
+    
+    # 兩個檔案對應到同一個 namespace 時 p_NN key 會互相覆蓋，直接中止
+    collisions = find_namespace_collisions((page_name for page_name, _ in targets), page_namespace)
+    if collisions:
+        for namespace, pages in collisions.items():
+            print(f'❌ namespace {namespace} 同時對應到: {", ".join(pages)}')
+        sys.exit(1)
+    
+    # 依路徑順序合併翻譯
+    for outcome in run_parallel(_process_job, targets, args.workers):
+        page_name = outcome.item[0]
+        print(outcome.output, end='')
+        if outcome.error:
+            print(f'❌ 處理 {page_name} 時發生錯誤:')
+            print(outcome.error)
+            failed_count += 1
+            continue
+        if outcome.result is None:
             failed_count += 1
+            continue
+        page_key, translations_zh, translations_en = outcome.result
+        if translations_zh:
+            # 更新翻譯 JSON
+            diff = zh_tw.merge(escape_key(page_key), translations_zh)
+            # 英文只補新 key，或中文已變更的 key 重設為占位符；已翻好的英文不被覆蓋
+            for key, placeholder in translations_en.items():
+                path = join_path([page_key, key])
+                if path not in en or path in diff.changed:
+                    en.set(path, placeholder)
+        success_count += 1
     
     # 保存更新後的翻譯
-    with open(TRANSLATIONS_DIR / 'zh-TW.json', 'w', encoding='utf-8') as f:
-        json.dump(zh_tw, f, ensure_ascii=False, indent=2)
-    
-    with open(TRANSLATIONS_DIR / 'en.json', 'w', encoding='utf-8') as f:
-        json.dump(en, f, ensure_ascii=False, indent=2)
+    zh_tw.save(TRANSLATIONS_DIR / 'zh-TW.json')
+    en.save(TRANSLATIONS_DIR / 'en.json')
     
     print('\n' + '=' * 60)
     print(f'\n✅ 批次處理完成！')
     print(f'📊 成功: {success_count} 個頁面')
     print(f'📊 失敗: {failed_count} 個頁面')
-    print(f'\n💾 翻譯檔案已更新: zh-TW.json, en.json')
+    print(f'\n{STATS.summary()}')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+LLM 翻譯批次的逐項驗證
+每個 key 分別檢查：有沒有回傳、型別是否與原文相同、{{count}} 這類插值變數是否完整保留、品牌名稱是否被翻掉
+不合格的 key 只剔除該項（交給呼叫端重新分批），其他項目照常寫入；模型自己多出來的 key 一律忽略
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple
+
+# 所有語言都必須原樣保留的品牌與產品名稱
+BRAND_TERMS = ("Apolnus", "Ultra S7", "One X", "SmartCasa")
+
+
+def brand_terms_prompt() -> str:
+    """prompt 中要求保留的品牌名稱清單，與驗證規則使用同一份 BRAND_TERMS"""
+    return ', '.join(f'"{term}"' for term in BRAND_TERMS)
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([\w.-]+)\s*\}\}')
+
+
+class BatchCheck(NamedTuple):
+    accepted: Dict[str, object]  # 通過驗證的 {key: 譯文}
+    rejected: Dict[str, str]  # {key: 原因}，包含沒有回傳的 key
+    unexpected: List[str]  # 請求中沒有、模型自己多出來的 key
+
+    def describe(self, limit: int = 3) -> str:
+        parts = [f'{key}（{reason}）' for key, reason in list(self.rejected.items())[:limit]]
+        if len(self.rejected) > limit:
+            parts.append(f'… 共 {len(self.rejected)} 條')
+        if self.unexpected:
+            parts.append(f'忽略 {len(self.unexpected)} 個多出的 key')
+        return '、'.join(parts)
+
+
+def placeholders(text: str) -> Counter:
+    return Counter(PLACEHOLDER_RE.findall(text))
+
+
+def check_value(source, translated) -> str:
+    """回傳不合格的原因，合格時回傳空字串"""
+    if isinstance(source, dict):
+        if not isinstance(translated, dict):
+            return '應為物件'
+        if set(translated) != set(source):
+            return '物件的 key 不一致'
+        for key, value in source.items():
+            reason = check_value(value, translated[key])
+            if reason:
+                return f'{key}: {reason}'
+        return ''
+
+    if not isinstance(source, str):
+        return '' if type(translated) is type(source) else f'應為 {type(source).__name__}'
+    if not isinstance(translated, str):
+        return '應為字串'
+    if source.strip() and not translated.strip():
+        return '空白譯文'
+    if placeholders(source) != placeholders(translated):
+        expected = ', '.join(sorted(placeholders(source))) or '無'
+        return f'插值變數不符（應為 {expected}）'
+    for term in BRAND_TERMS:
+        if source.count(term) > translated.count(term):
+            return f'品牌名稱 {term} 未保留'
+    return ''
+
+
+def validate_batch(batch: Dict[str, object], translated: Dict[str, object]) -> BatchCheck:
+    accepted, rejected = {}, {}
+    for key, source in batch.items():
+        if key not in translated:
+            rejected[key] = '未回傳'
+            continue
+        reason = check_value(source, translated[key])
+        if reason:
+            rejected[key] = reason
+        else:
+            accepted[key] = translated[key]
+    unexpected = [key for key in translated if key not in batch]
+    return BatchCheck(accepted, rejected, unexpected)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+翻譯流程端到端效能測試（離線）
+在暫存目錄建立語系檔，啟動 mock_forge_server，實際執行 translate_all_langs / translate_with_ai，
+輸出 requests/s、mock 伺服器端的 p50/p95 處理延遲、重試次數、完成率與總耗時；用來驗證併發、批次調整是否真的有幫助
+延遲是 mock handler 的處理時間（模擬的 API 延遲），不含連線、rate limiter 等待與客戶端排隊；客戶端的體感以總耗時與 req/s 為準
+
+範例（從專案根目錄執行）：-- 之後的參數傳給所有執行的翻譯腳本（只能用兩者都有的 --rate、--burst、--token-budget），
+只有 translate_all_langs 才有的參數（--concurrency 等）以 --all-args 傳入，translate_with_ai 專用的以 --ai-args 傳入
+    python3 scripts/bench_translate.py --latency 0.3 --rate-429 0.05 --all-args "--concurrency 16" -- --rate 20
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mock_forge_server import MOCK_PREFIX, add_mock_arguments, config_from_args, start_server
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+LOCALE_SUBDIR = Path('client/src/i18n/locales')
+# 主語系檔：腳本使用 zh-TW.json，舊目錄結構為 tw.json
+MASTER_CANDIDATES = ['zh-TW.json', 'tw.json']
+
+SCRIPTS = {
+    'all': 'translate_all_langs.py',
+    'ai': 'translate_with_ai.py',
+}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def find_master(locale_dir: Path) -> Path:
+    for name in MASTER_CANDIDATES:
+        if (locale_dir / name).exists():
+            return locale_dir / name
+    raise FileNotFoundError(f'找不到主語系檔（{", ".join(MASTER_CANDIDATES)}）: {locale_dir}')
+
+
+def load_master(path: Path, namespaces: int) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if namespaces:
+        data = dict(list(data.items())[:namespaces])
+    return data
+
+
+def prepare_workspace(workdir: Path, script: str, master: dict):
+    """建立只有主語系檔的目錄；translate_with_ai 另外需要全部為 [EN] 佔位符的 en.json"""
+    locale_dir = workdir / LOCALE_SUBDIR
+    locale_dir.mkdir(parents=True)
+    with open(locale_dir / 'zh-TW.json', 'w', encoding='utf-8') as f:
+        json.dump(master, f, ensure_ascii=False, indent=2)
+    if script == 'ai':
+        def placeholder(obj):
+            if isinstance(obj, dict):
+                return {k: placeholder(v) for k, v in obj.items()}
+            return f'[EN] {obj}' if isinstance(obj, str) else obj
+        with open(locale_dir / 'en.json', 'w', encoding='utf-8') as f:
+            json.dump(placeholder(master), f, ensure_ascii=False, indent=2)
+
+
+def count_translated(workdir: Path):
+    """回傳 (mock 譯文數, 字串總數)，用來確認沒有批次在重試中遺失"""
+    done = total = 0
+    for path in (workdir / LOCALE_SUBDIR).glob('*.json'):
+        if path.name == 'zh-TW.json':
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            stack = [json.load(f)]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, dict):
+                stack.extend(obj.values())
+            elif isinstance(obj, str):
+                total += 1
+                done += obj.startswith(MOCK_PREFIX)
+    return done, total
+
+
+def run_once(script: str, master: dict, args, extra_args) -> dict:
+    server = start_server(config_from_args(args))
+    try:
+        with tempfile.TemporaryDirectory(prefix='bench_translate_') as tmp:
+            workdir = Path(tmp)
+            prepare_workspace(workdir, script, master)
+            env = dict(os.environ, BUILT_IN_FORGE_API_URL=server.url, BUILT_IN_FORGE_API_KEY='mock')
+            # 翻譯記憶與 journal 都以相對路徑寫在暫存目錄中，每次執行都是全新狀態
+            cmd = [sys.executable, str(SCRIPTS_DIR / SCRIPTS[script]), *extra_args]
+
+            start = time.perf_counter()
+            proc = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True)
+            wall = time.perf_counter() - start
+
+            if args.verbose or proc.returncode:
+                print(proc.stdout)
+                print(proc.stderr, file=sys.stderr)
+            done, total = count_translated(workdir)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with server.lock:
+        statuses = dict(server.statuses)
+        latencies = list(server.latencies)
+    requests = sum(statuses.values())
+    return {
+        'returncode': proc.returncode,
+        'wall': wall,
+        'requests': requests,
+        'statuses': statuses,
+        'rps': requests / wall if wall else 0.0,
+        # mock handler 的處理時間，不是客戶端量到的延遲
+        'server_p50': percentile(latencies, 0.5),
+        'server_p95': percentile(latencies, 0.95),
+        'retries': proc.stdout.count('⏳'),
+        'done': done,
+        'total': total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='翻譯流程端到端效能測試（mock API）')
+    parser.add_argument('--script', choices=['all', 'ai', 'both'], default='both', help='要測試的翻譯腳本')
+    parser.add_argument('--locale-dir', default=str(LOCALE_SUBDIR), help='主語系檔所在目錄（預設從專案根目錄執行）')
+    parser.add_argument('--namespaces', type=int, default=0, help='只取前 N 個 namespace（0 為全部）')
+    parser.add_argument('--verbose', action='store_true', help='輸出翻譯腳本的完整 log')
+    parser.add_argument('--all-args', default='', metavar='ARGS',
+                        help='只傳給 translate_all_langs.py 的參數，例如 "--concurrency 16"')
+    parser.add_argument('--ai-args', default='', metavar='ARGS', help='只傳給 translate_with_ai.py 的參數')
+    add_mock_arguments(parser)
+    args, extra_args = parser.parse_known_args()
+    if extra_args[:1] == ['--']:
+        extra_args = extra_args[1:]
+    script_args = {'all': shlex.split(args.all_args), 'ai': shlex.split(args.ai_args)}
+
+    master = load_master(find_master(Path(args.locale_dir)), args.namespaces)
+    scripts = ['all', 'ai'] if args.script == 'both' else [args.script]
+    print(f'🧪 {len(master)} 個 namespace，mock 延遲 {args.latency}s (sigma {args.sigma})，'
+          f'429 {args.rate_429:.0%}，5xx {args.error_rate:.0%}，截斷 {args.truncate_rate:.0%}，'
+          f'markdown {args.markdown_rate:.0%}')
+    for script in scripts:
+        cmd_args = extra_args + script_args[script]
+        print(f'\n⏱️  {SCRIPTS[script]} {" ".join(cmd_args)}')
+        r = run_once(script, master, args, cmd_args)
+        status = ', '.join(f'{code}×{n}' for code, n in sorted(r['statuses'].items()))
+        print(f'   總耗時 {r["wall"]:.2f}s   {r["requests"]} 個請求 ({status})   {r["rps"]:.1f} req/s')
+        print(f'   伺服器端延遲 p50 {r["server_p50"] * 1000:.0f} ms   p95 {r["server_p95"] * 1000:.0f} ms'
+              f'（mock 處理時間，不含連線與排隊）   重試 {r["retries"]} 次')
+        print(f'   完成 {r["done"]}/{r["total"]} 條'
+              + ('' if r['returncode'] == 0 else f'   ❌ 結束碼 {r["returncode"]}'))
+
+
+if __name__ == '__main__':
+    main()
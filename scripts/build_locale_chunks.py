@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+依 namespace 拆分語系檔，並產生路由 → namespace 的 manifest
+client/src/i18n/config.ts 目前一次載入 7 個語言的完整語系檔；拆成 {語言}/{namespace}.json 之後，
+前端只需載入目前語言的 common namespace 與目前路由用到的 namespace
+
+輸出（預設 client/public/locales，從專案根目錄執行）：
+    {語言}/{namespace}.json   單一 namespace 的內容（不縮排）
+    {語言}/_root.json         語系檔第一層不是物件的項目
+    manifest.json             languages / common / routes / namespaces（各語言 chunk 的檔名與大小）
+
+--release：檔名加上內容雜湊（{namespace}.{hash}.json），並產生 .gz/.br 與整個語言的 {語言}.{hash}.json，
+前端一律透過 manifest 取得檔名，雜湊檔可設定 immutable 長快取；manifest.json 本身不快取
+--fallback：拆分前先補齊各語言缺少的 key（manifest 的 fallback 欄位記錄使用的規則）
+有 {{…}} 插值的字串另外預先編譯成 {語言}/_templates.json（manifest 的 templates 欄位）
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from atomic_output import STATS, write_json_if_changed
+from locale_artifacts import artifact_files, brotli, minified_json, remove_stale, write_artifact
+from locale_fallback import POLICIES, load_locales, print_coverage, resolve_locales
+from locale_table import FALLBACK_LNG, LANG_FILES
+from locale_templates import collect_templates, present_groups, validate_variables
+from route_graph import SourceGraph
+
+MANIFEST_VERSION = 2
+MANIFEST_FILE = 'manifest.json'
+ROOT_CHUNK = '_root'
+# 預先編譯的插值字串（見 locale_templates.py）
+TEMPLATES_CHUNK = '_templates'
+_RESERVED_CHUNKS = (ROOT_CHUNK, TEMPLATES_CHUNK)
+# manifest 中的檔名都相對於這個 URL
+BASE_URL = '/locales/'
+
+_CHUNK_NAME_RE = re.compile(r'^[\w-]+$')
+
+
+def split_locale(data: dict) -> dict:
+    """{namespace: 內容}；第一層不是物件（或名稱不能當檔名）的項目集中到 ROOT_CHUNK
+    第一層含 "." 的 key（"home.t_a6ec6029"）歸到 home chunk，以 "t_a6ec6029" 保存：
+    i18next 先找巢狀路徑、找不到才找含 "." 的 key，所以與巢狀寫法衝突時保留巢狀的值"""
+    chunks, root, dotted = {}, {}, []
+    for key, value in data.items():
+        if isinstance(value, dict) and _CHUNK_NAME_RE.match(key) and key not in _RESERVED_CHUNKS:
+            chunks[key] = dict(value)
+        elif '.' in key and _CHUNK_NAME_RE.match(key.split('.', 1)[0]) and key.split('.', 1)[0] not in _RESERVED_CHUNKS:
+            dotted.append((key, value))
+        else:
+            root[key] = value
+    for key, value in dotted:
+        namespace, rest = key.split('.', 1)
+        chunks.setdefault(namespace, {}).setdefault(rest, value)
+    if root:
+        chunks[ROOT_CHUNK] = root
+    return chunks
+
+
+def write_chunks(out_dir: Path, lng: str, chunks: dict, release: bool) -> dict:
+    """寫出一個語言的所有 chunk（含 TEMPLATES_CHUNK），刪除舊版本與已不存在的 chunk；回傳 {namespace: manifest 項目}"""
+    lang_dir = out_dir / lng
+    entries, written = {}, []
+    for namespace, data in chunks.items():
+        entry = write_artifact(lang_dir, namespace, minified_json(data), hashed=release, compress=release)
+        written += artifact_files(entry)
+        entry['file'] = f'{lng}/{entry["file"]}'
+        entries[namespace] = entry
+    removed = remove_stale(lang_dir, written)
+    if removed:
+        print(f'   🗑️  {lng}: 移除 {removed} 個舊檔案')
+    return entries
+
+
+def route_namespaces(src_dir: Path, app_file: Path, known: set):
+    """回傳 (common namespace, {路由: namespace 清單}, 程式碼引用但語系檔沒有的 namespace)"""
+    graph = SourceGraph(src_dir)
+    routes = graph.routes(app_file)
+    pages_dir = (src_dir / 'pages').resolve()
+    # App.tsx 本身與它載入的共用元件（不含頁面）：每個路由都需要
+    page_files = {path for path in graph.closure([app_file]) if pages_dir in path.parents}
+    shell = graph.namespaces(graph.closure([app_file], exclude=page_files))
+
+    # 同一路徑可能出現在多個 <Switch>（例如 admin 區段），取聯集
+    used_by_route: dict = {}
+    for route in routes:
+        used = graph.namespaces(graph.closure([route.source]))
+        used_by_route.setdefault(route.path, set()).update(used)
+    unknown = set(shell).union(*used_by_route.values()) - known
+
+    # 每個路由都會用到的 namespace（各頁面自行載入的 Navbar/Footer 等）也歸入 common
+    shared = set.intersection(*used_by_route.values()) if used_by_route else set()
+    common = sorted((shell | shared) & known)
+    if ROOT_CHUNK in known:
+        common.append(ROOT_CHUNK)
+    route_map = {path: sorted((used & known) - set(common)) for path, used in used_by_route.items()}
+    return common, route_map, unknown
+
+
+def main():
+    parser = argparse.ArgumentParser(description='依 namespace 拆分語系檔並產生路由 manifest')
+    parser.add_argument('--locale-dir', default='client/src/i18n/locales', help='語系檔目錄（預設從專案根目錄執行）')
+    parser.add_argument('--src-dir', default='client/src', help='前端原始碼目錄')
+    parser.add_argument('--app', default='client/src/App.tsx', help='定義路由的檔案')
+    parser.add_argument('--out-dir', default='client/public/locales', help='輸出目錄')
+    parser.add_argument('--release', action='store_true', help='內容雜湊檔名並預先產生 .gz/.br')
+    parser.add_argument('--fallback', choices=sorted(POLICIES),
+                        help='先依 fallback 順序補齊各語言再拆分（見 locale_fallback.py），前端不需要執行期 fallback')
+    args = parser.parse_args()
+
+    locale_dir, out_dir = Path(args.locale_dir), Path(args.out_dir)
+    print(f'🚀 拆分語系檔 {locale_dir} → {out_dir}{"（release）" if args.release else ""}')
+    if args.release and brotli is None:
+        print('   ⚠️  未安裝 brotli（pip install brotli），只產生 .gz')
+
+    locales = load_locales(locale_dir)
+    eager_bytes = sum(len(minified_json(data)) for data in locales.values())
+    if args.fallback:
+        if FALLBACK_LNG not in locales:
+            sys.exit(f'❌ 找不到主語系 {FALLBACK_LNG}')
+        resolved = resolve_locales(locales, POLICIES[args.fallback])
+        print_coverage([coverage for _, coverage in resolved.values()])
+        locales = {lng: data for lng, (data, _) in resolved.items()}
+
+    templates = {lng: collect_templates(data) for lng, data in locales.items()}
+    present = {lng: present_groups(data) for lng, data in locales.items()}
+    mismatches = validate_variables(templates, present) if FALLBACK_LNG in locales else []
+
+    sizes = {}
+    bundles = {}
+    template_entries = {}
+    for lng, data in locales.items():
+        minified = minified_json(data)
+        if args.release:
+            # 不分 chunk 的整個語言（尚未改用 manifest 的載入方式使用）
+            bundles[lng] = write_artifact(out_dir, lng, minified)
+        chunks = split_locale(data)
+        if templates[lng]:
+            chunks[TEMPLATES_CHUNK] = templates[lng]
+        for namespace, entry in write_chunks(out_dir, lng, chunks, args.release).items():
+            if namespace == TEMPLATES_CHUNK:
+                template_entries[lng] = entry
+            else:
+                sizes.setdefault(namespace, {})[lng] = entry
+        print(f'   📦 {lng}: {len(chunks)} 個 chunk')
+
+    common, routes, unknown = route_namespaces(Path(args.src_dir), Path(args.app), set(sizes))
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'base': BASE_URL,
+        'fallbackLng': FALLBACK_LNG,
+        'fallback': args.fallback,
+        'languages': [lng for lng in LANG_FILES if any(lng in s for s in sizes.values())],
+        'common': common,
+        'routes': routes,
+        'namespaces': {namespace: sizes[namespace] for namespace in sorted(sizes)},
+        'templates': template_entries,
+    }
+    if args.release:
+        manifest['bundles'] = bundles
+        write_json_if_changed(out_dir / MANIFEST_FILE, manifest, indent=None, separators=(',', ':'))
+    else:
+        write_json_if_changed(out_dir / MANIFEST_FILE, manifest)
+    keep = [MANIFEST_FILE] + [name for entry in bundles.values() for name in artifact_files(entry)]
+    remove_stale(out_dir, keep)
+
+    # 以預設語言的首頁估算首次載入量
+    first_entries = [sizes[ns][FALLBACK_LNG] for ns in common + routes.get('/', []) if FALLBACK_LNG in sizes[ns]]
+    first_load = sum(entry['bytes'] for entry in first_entries)
+    print(f'\n🧭 {len(routes)} 個路由，common namespace {len(common)} 個，'
+          f'路由平均 {sum(map(len, routes.values())) / max(len(routes), 1):.1f} 個 namespace')
+    print(f'📉 首頁（{FALLBACK_LNG}）首次載入 {first_load / 1024:.1f} KB，原本一次載入 7 語系共 {eager_bytes / 1024:.1f} KB')
+    if args.release:
+        for encoding in ('gz', 'br'):
+            if all(encoding in entry for entry in first_entries):
+                compressed = sum(entry[encoding] for entry in first_entries)
+                print(f'   壓縮後（{encoding}）{compressed / 1024:.1f} KB')
+    if unknown:
+        print(f'⚠️  程式碼引用但語系檔中沒有的 namespace: {", ".join(sorted(unknown))}')
+    print(f'🧩 預先編譯插值字串 {sum(map(len, templates.values()))} 條')
+    for mismatch in mismatches:
+        print(f'   ❌ 插值變數不一致 {mismatch.describe()}')
+    print(STATS.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+資料區塊保護範圍索引
+單次走訪檔案並追蹤括號巢狀，把「資料保留」的區段（資料陣列、address/phone 等屬性、href/src 屬性值）
+記錄成排序好的 (start, end) 區間，之後以 bisect 在 O(log n) 內判斷某個位置是否受保護
+"""
+
+import re
+from bisect import bisect_right
+from typing import Iterable, List, Tuple
+
+_OPENERS = {'[': ']', '{': '}', '(': ')'}
+_CLOSERS = frozenset(_OPENERS.values())
+
+
+def _compile_scanner(props: Iterable[str], attrs: Iterable[str]):
+    props = '|'.join(re.escape(p) for p in props) or r'(?!)'
+    attrs = '|'.join(re.escape(a) for a in attrs) or r'(?!)'
+    return re.compile(
+        r'//[^\n]*'
+        r'|/\*.*?\*/'
+        r"|'(?:[^'\\\n]|\\.)*'"
+        r'|"(?:[^"\\\n]|\\.)*"'
+        r'|`(?:[^`\\]|\\.)*`'
+        r'|\bconst[ \t]+(?P<decl>[A-Za-z_$][\w$]*)[ \t]*(?::[^=\n]+)?=[ \t]*(?=[\[{])'
+        r'|\b(?P<prop>' + props + r')[ \t]*:(?!:)'
+        r'|\b(?P<attr>' + attrs + r')[ \t]*=(?![=>])'
+        r'|[\[\]{}(),;]',
+        re.DOTALL,
+    )
+
+
+class ExclusionIndex:
+    """排序且互不重疊的保護區間"""
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]]):
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        self.ranges = merged
+        self._starts = [start for start, _ in merged]
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """[start, end) 是否與任何保護區間重疊"""
+        i = bisect_right(self._starts, end - 1) - 1
+        return i >= 0 and self.ranges[i][1] > start
+
+
+def build_exclusion_index(content: str, declarations: Iterable[str] = (), props: Iterable[str] = (),
+                          attrs: Iterable[str] = (), protect_arrays: bool = True) -> ExclusionIndex:
+    """
+    建立保護範圍索引
+    declarations：const 宣告名稱，整個 [...] / {...} 受保護
+    protect_arrays：所有 const x = [...] 陣列常值一律受保護
+    props：物件屬性名稱，從屬性名稱到值結束（同一層的 , ; 或外層括號關閉）受保護
+    attrs：JSX 屬性名稱，屬性值（字串或 {...}）受保護
+    """
+    declarations = frozenset(declarations)
+    scanner = _compile_scanner(props, attrs)
+    ranges = []
+    # 堆疊元素：(開括號, 關閉時要記錄的區間起點或 None)
+    stack: List[Tuple[str, object]] = []
+    # 進行中的 prop：(起點, 所在深度)
+    open_props: List[Tuple[int, int]] = []
+    pending_decl = None  # 下一個開括號屬於 const 宣告
+    pending_attr = None  # 下一個字串或 { 屬於受保護的屬性值
+
+    def close_props(depth, pos):
+        while open_props and open_props[-1][1] >= depth:
+            ranges.append((open_props.pop()[0], pos))
+
+    for m in scanner.finditer(content):
+        tok = m.group()
+        ch = tok[0]
+        attr_start, pending_attr = pending_attr, None
+
+        if m.group('decl') is not None:
+            name = m.group('decl')
+            bracket = content[m.end()]
+            if name in declarations or (protect_arrays and bracket == '['):
+                pending_decl = m.start()
+        elif m.group('prop') is not None:
+            open_props.append((m.start(), len(stack)))
+        elif m.group('attr') is not None:
+            pending_attr = m.start()
+        elif ch in _OPENERS:
+            start = None
+            if pending_decl is not None:
+                start, pending_decl = pending_decl, None
+            elif attr_start is not None and ch == '{':
+                start = attr_start
+            stack.append((ch, start))
+        elif ch in _CLOSERS:
+            depth = len(stack)
+            close_props(depth, m.start())
+            if stack:
+                _, start = stack.pop()
+                if start is not None:
+                    ranges.append((start, m.end()))
+        elif ch == ',' or ch == ';':
+            close_props(len(stack), m.start())
+        elif attr_start is not None and ch in '\'"`':
+            ranges.append((attr_start, m.end()))
+
+    close_props(0, len(content))
+    return ExclusionIndex(ranges)
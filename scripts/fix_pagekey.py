@@ -4,7 +4,9 @@
 """
 
 import os
-import re
+
+from atomic_output import STATS, write_text_if_changed
+from rule_rewriter import RuleSet
 
 # pageKey 對照表：舊的 pageKey -> 新的 pageKey（與資料庫一致）
 PAGEKEY_MAPPING = {
@@ -34,27 +36,28 @@ PAGEKEY_MAPPING = {
     # "support": "support",
 }
 
+# 所有對照合併成一個 literal 比對，每個文件只掃描一次
+PAGEKEY_RULES = RuleSet(
+    [(f'pageKey="{old_key}"', f'pageKey="{new_key}"') for old_key, new_key in PAGEKEY_MAPPING.items()],
+    literal=True,
+)
+
 def fix_file(filepath):
     """修正單個文件的 pageKey"""
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    original_content = content
-    modified = False
-    
     # 替換所有匹配的 pageKey
-    for old_key, new_key in PAGEKEY_MAPPING.items():
-        pattern = f'pageKey="{old_key}"'
-        replacement = f'pageKey="{new_key}"'
-        if pattern in content:
-            content = content.replace(pattern, replacement)
+    content, hits = PAGEKEY_RULES.apply(content)
+    modified = False
+    for (old_key, new_key), count in zip(PAGEKEY_MAPPING.items(), hits):
+        if count:
             modified = True
             print(f"  ✓ {filepath}: {old_key} -> {new_key}")
     
     # 如果有修改，寫回文件
     if modified:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_text_if_changed(filepath, content)
         return True
     return False
 
@@ -74,6 +77,9 @@ def main():
                     fixed_count += 1
     
     print(f"\n✅ 完成！共修正 {fixed_count} 個文件")
+    print(STATS.summary())
+    for line in PAGEKEY_RULES.report():
+        print(f"   {line}")
 
 if __name__ == "__main__":
     main()
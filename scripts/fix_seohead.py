@@ -7,6 +7,8 @@
 import re
 from pathlib import Path
 
+from atomic_output import STATS, write_text_if_changed
+
 PAGES_DIR = Path("client/src/pages")
 
 def fix_file(file_path):
@@ -20,9 +22,7 @@ def fix_file(file_path):
     
     new_content = re.sub(pattern, replacement, content)
     
-    if new_content != content:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
+    if write_text_if_changed(file_path, new_content):
         print(f"✅ Fixed: {file_path.name}")
         return True
     return False
@@ -42,3 +42,4 @@ if products_dir.exists():
             fixed_count += 1
 
 print(f"✅ Fixed {fixed_count} files")
+print(STATS.summary())
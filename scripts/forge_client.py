@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Forge chat-completions 共用 HTTP client
+以 http.client 維持 keep-alive 連線池，數千個小批次不必每次重新做 TCP/TLS 握手
+連線與讀取分別設定逾時；回應支援 gzip，請求可選擇 gzip 壓縮；每個請求回傳耗時統計
+非 2xx 回應以 urllib.error.HTTPError 拋出，rate_limiter 的重試判斷（429/5xx/Retry-After）可直接沿用
+"""
+
+import gzip
+import http.client
+import io
+import json
+import os
+import queue
+import threading
+import time
+from typing import NamedTuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+# 伺服器不一定接受 gzip 請求內容，預設關閉
+COMPRESS_REQUESTS = os.environ.get('FORGE_GZIP_REQUESTS', '') == '1'
+COMPRESS_MIN_BYTES = 1024
+
+# 重用的 keep-alive 連線可能已被伺服器關閉，遇到這些錯誤時換新連線重送一次
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, BrokenPipeError, ConnectionResetError)
+
+
+class RequestTiming(NamedTuple):
+    connect: float  # 建立連線的秒數（重用連線為 0）
+    ttfb: float  # 送出請求到收到回應標頭
+    total: float
+    reused: bool
+    sent_bytes: int  # 實際送出的 body 大小（壓縮後）
+    received_bytes: int  # 實際收到的 body 大小（解壓前）
+
+
+class ForgeResponse(NamedTuple):
+    data: dict
+    timing: RequestTiming
+
+
+class ForgeClient:
+    """
+    一個 client 對應一個 endpoint，可在多個 thread 中共用（閒置連線放在 thread-safe 的 LifoQueue，計數以 lock 保護）
+    閒置連線最多保留 pool_size 條，同時進行的請求超過時臨時開新連線
+    """
+
+    def __init__(self, api_url: str, api_key: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 compress_requests: bool = COMPRESS_REQUESTS):
+        parts = urlsplit(api_url)
+        self.url = api_url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.api_key = api_key
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.compress_requests = compress_requests
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.total_time = 0.0
+        self.connect_time = 0.0
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        conn = cls(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        # 連線建立後改用讀取逾時（LLM 回應可能要數十秒）
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self.connections += 1
+        return conn
+
+    def _checkout_fresh(self):
+        start = time.perf_counter()
+        conn = self._new_connection()
+        return conn, False, time.perf_counter() - start
+
+    def _checkout(self):
+        """回傳 (連線, 是否為重用, 建立連線秒數)"""
+        try:
+            return self._idle.get_nowait(), True, 0.0
+        except queue.Empty:
+            return self._checkout_fresh()
+
+    def _checkin(self, conn: http.client.HTTPConnection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send(self, conn, body: bytes, headers: dict):
+        start = time.perf_counter()
+        conn.request('POST', self.path, body=body, headers=headers)
+        response = conn.getresponse()
+        ttfb = time.perf_counter() - start
+        raw = response.read()
+        return response, raw, ttfb
+
+    def post_json(self, payload: dict) -> ForgeResponse:
+        """送出 JSON 請求並解析 JSON 回應；非 2xx 時拋出 HTTPError"""
+        body = json.dumps(payload).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.api_key}',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+        }
+        if self.compress_requests and len(body) >= COMPRESS_MIN_BYTES:
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+
+        start = time.perf_counter()
+        conn, reused, connect = self._checkout()
+        try:
+            try:
+                response, raw, ttfb = self._send(conn, body, headers)
+            except _STALE_ERRORS:
+                if not reused:
+                    raise
+                conn.close()
+                conn, reused, connect = self._checkout_fresh()
+                response, raw, ttfb = self._send(conn, body, headers)
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+
+        total = time.perf_counter() - start
+        timing = RequestTiming(connect, ttfb, total, reused, len(body), len(raw))
+        with self._lock:
+            self.requests += 1
+            self.total_time += total
+            self.connect_time += connect
+
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            raw = gzip.decompress(raw)
+        if not 200 <= response.status < 300:
+            raise HTTPError(self.url, response.status, response.reason, response.msg, io.BytesIO(raw))
+        return ForgeResponse(json.loads(raw.decode('utf-8')), timing)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def summary(self) -> str:
+        average = self.total_time / self.requests if self.requests else 0.0
+        return (f'{self.requests} 個請求、{self.connections} 條連線，'
+                f'平均 {average:.2f}s，建立連線共 {self.connect_time:.2f}s')
@@ -6,10 +6,17 @@
 
 import json
 import re
+import argparse
+import time
 from pathlib import Path
 
+from locale_table import LocaleTable, escape_key
+from scan_stream import ScanStreamError, iter_scan_results
+
 # 輸入輸出路徑
-INPUT_FILE = Path('/home/ubuntu/apolnus/scripts/extracted/scan_results.json')
+INPUT_FILE = Path('/home/ubuntu/apolnus/scripts/extracted/scan_results.jsonl')
+# --follow 時接受在啟動前多少秒內開始的掃描（scan_pages 與本腳本幾乎同時啟動）
+FOLLOW_GRACE = 60
 OUTPUT_DIR = Path('/home/ubuntu/apolnus/client/src/i18n/locales')
 EXISTING_ZH_TW = OUTPUT_DIR / 'zh-TW.json'
 EXISTING_EN = OUTPUT_DIR / 'en.json'
@@ -21,10 +28,6 @@ with open(EXISTING_ZH_TW, 'r', encoding='utf-8') as f:
 with open(EXISTING_EN, 'r', encoding='utf-8') as f:
     existing_en = json.load(f)
 
-# 載入掃描結果
-with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-    scan_results = json.load(f)
-
 # 頁面特定翻譯模板（手動定義核心內容）
 PAGE_TRANSLATIONS = {
     'whereToBuy': {
@@ -833,45 +836,71 @@ LEGAL_TRANSLATIONS = {
     },
 }
 
-def generate_all_translations():
+def report_uncovered_pages(follow=False):
+    """
+    逐筆讀取掃描結果，列出含中文但還沒有翻譯模板的頁面
+    掃描結果以 generator 讀取，不會整份載入記憶體
+    """
+    if not follow and not INPUT_FILE.exists():
+        print(f'ℹ️  找不到掃描結果，略過覆蓋率檢查: {INPUT_FILE}')
+        return
+    
+    covered = set(PAGE_TRANSLATIONS) | set(LEGAL_TRANSLATIONS)
+    uncovered = 0
+    # follow 模式只接受最近開始的掃描，避免讀到上一次執行留下的完整結果
+    started_after = time.time() - FOLLOW_GRACE if follow else None
+    try:
+        for result in iter_scan_results(INPUT_FILE, follow=follow, started_after=started_after):
+            base_name = result['page_name'].rsplit('/', 1)[-1]
+            page_key = base_name[0].lower() + base_name[1:]
+            if result['chinese_texts'] and page_key not in covered:
+                print(f'⚠️  {result["page_name"]} 尚無翻譯模板（{len(result["chinese_texts"])} 個中文片段）')
+                uncovered += 1
+    except ScanStreamError as e:
+        print(f'❌ {e}')
+        return
+    print(f'📊 {uncovered} 個頁面尚無翻譯模板\n')
+
+def generate_all_translations(follow=False):
     """生成所有語言的翻譯"""
     print('🚀 開始生成翻譯檔案...\n')
     
-    # 合併現有翻譯和新翻譯
+    # 以葉節點合併現有翻譯和新翻譯：模板中的 key 覆寫，語系檔中有、模板沒有的 key 保留
     all_translations = {
-        'zh-TW': {**existing_zh_tw},
-        'zh-CN': {},
-        'en': {**existing_en},
-        'ja': {},
-        'ko': {},
-        'de': {},
-        'fr': {},
+        'zh-TW': LocaleTable(existing_zh_tw),
+        'en': LocaleTable(existing_en),
     }
     
     # 添加頁面翻譯
     for page_key, page_trans in PAGE_TRANSLATIONS.items():
-        for lang in ['zh-TW', 'en']:
+        for lang, table in all_translations.items():
             if lang in page_trans:
-                all_translations[lang][page_key] = page_trans[lang]
-                print(f'✅ 添加 {page_key} ({lang}) 翻譯')
+                diff = table.merge(escape_key(page_key), page_trans[lang])
+                print(f'✅ 添加 {page_key} ({lang}) 翻譯：{diff.describe()}')
     
     # 添加法律頁面翻譯
     for page_key, page_trans in LEGAL_TRANSLATIONS.items():
-        for lang in ['zh-TW', 'en']:
+        for lang, table in all_translations.items():
             if lang in page_trans:
-                all_translations[lang][page_key] = page_trans[lang]
-                print(f'✅ 添加 {page_key} ({lang}) 翻譯（段落式）')
+                diff = table.merge(escape_key(page_key), page_trans[lang])
+                print(f'✅ 添加 {page_key} ({lang}) 翻譯（段落式）：{diff.describe()}')
     
     # 保存所有語言檔案
-    for lang, translations in all_translations.items():
-        if translations:  # 只保存有內容的語言
-            output_file = OUTPUT_DIR / f'{lang}.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(translations, f, ensure_ascii=False, indent=2)
+    for lang, table in all_translations.items():
+        output_file = OUTPUT_DIR / f'{lang}.json'
+        if table.save(output_file):
             print(f'💾 保存 {lang}.json')
+        else:
+            print(f'⏭️  {lang}.json 沒有變更，略過寫入')
     
     print('\n✅ 翻譯檔案生成完成！')
-    print(f'📊 總共生成了 {len([t for t in all_translations.values() if t])} 個語言檔案')
+    print(f'📊 總共生成了 {len(all_translations)} 個語言檔案\n')
+    
+    report_uncovered_pages(follow)
 
 if __name__ == '__main__':
-    generate_all_translations()
+    parser = argparse.ArgumentParser(description='生成結構化翻譯 JSON 和 SEO 配置')
+    parser.add_argument('--follow', action='store_true',
+                        help='掃描仍在進行時持續讀取 scan_results.jsonl，直到掃描結束')
+    args = parser.parse_args()
+    generate_all_translations(args.follow)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+翻譯 key 配置器
+key 由文字內容決定（t_ + md5 前 8 碼），同一段文字每次執行都得到相同的 key
+已配置的 key 記錄在 registry 檔案中；不同文字撞到同一個 key 時，依序延長 hash（10、12…32 碼）直到不衝突
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from atomic_output import write_json_if_changed
+
+REGISTRY_VERSION = 1
+
+# 語系檔中已存在、但值不是字串（巢狀物件）的 key
+_SUBTREE = object()
+
+
+class KeyCollisionError(Exception):
+    pass
+
+
+def normalize_text(text: str) -> str:
+    return text.strip()
+
+
+def text_digest(text: str) -> str:
+    return hashlib.md5(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def candidate_keys(text: str, base: Optional[str] = None) -> Iterator[str]:
+    """依序產生候選 key：base（或 t_ + 8 碼 hash），衝突時逐步延長 hash"""
+    digest = text_digest(text)
+    if base:
+        yield base
+        for n in range(8, len(digest) + 1, 2):
+            yield f'{base}_{digest[:n]}'
+    else:
+        for n in range(8, len(digest) + 1, 2):
+            yield f't_{digest[:n]}'
+
+
+class KeyAllocator:
+    """
+    registry：{namespace: {key: 文字}}
+    seed() 載入的語系檔 key 只用來檢查衝突，不會寫入 registry
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path else None
+        self.registry: Dict[str, Dict[str, str]] = {}
+        self.dirty = False
+        self.collisions = 0
+        self._seeded: Dict[str, Dict[str, object]] = {}
+        self._by_text: Dict[str, Dict[str, str]] = {}
+
+    def load(self) -> 'KeyAllocator':
+        if self.path and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != REGISTRY_VERSION:
+                raise ValueError(f'不支援的 key registry 版本: {data.get("version")}')
+            for namespace, keys in data.get('namespaces', {}).items():
+                for key, text in keys.items():
+                    self._record(namespace, key, text)
+        return self
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        namespaces = {ns: dict(sorted(keys.items())) for ns, keys in sorted(self.registry.items())}
+        write_json_if_changed(self.path, {'version': REGISTRY_VERSION, 'namespaces': namespaces})
+        self.dirty = False
+
+    def seed(self, translations: dict):
+        """載入語系檔（{namespace: {key: 文字 或 巢狀物件}}），已存在的 key 視為已占用"""
+        for namespace, keys in translations.items():
+            if not isinstance(keys, dict):
+                continue
+            seeded = self._seeded.setdefault(namespace, {})
+            by_text = self._by_text.setdefault(namespace, {})
+            for key, value in keys.items():
+                if isinstance(value, str):
+                    seeded[key] = normalize_text(value)
+                    by_text.setdefault(normalize_text(value), key)
+                else:
+                    seeded[key] = _SUBTREE
+
+    def _record(self, namespace: str, key: str, text: str):
+        self.registry.setdefault(namespace, {})[key] = normalize_text(text)
+        self._by_text.setdefault(namespace, {}).setdefault(normalize_text(text), key)
+
+    def _owner(self, namespace: str, key: str):
+        """key 目前對應的文字（未占用時為 None）"""
+        owner = self.registry.get(namespace, {}).get(key)
+        if owner is None:
+            owner = self._seeded.get(namespace, {}).get(key)
+        return owner
+
+    def lookup(self, namespace: str, text: str) -> Optional[str]:
+        return self._by_text.get(namespace, {}).get(normalize_text(text))
+
+    def allocate(self, namespace: str, text: str, base: Optional[str] = None) -> str:
+        """取得文字在 namespace 中的 key，已配置過則沿用"""
+        existing = self.lookup(namespace, text)
+        if existing:
+            return existing
+
+        normalized = normalize_text(text)
+        for key in candidate_keys(normalized, base):
+            owner = self._owner(namespace, key)
+            if owner is None:
+                self._record(namespace, key, normalized)
+                self.dirty = True
+                return key
+            if owner == normalized:
+                return key
+            self.collisions += 1
+        raise KeyCollisionError(f'無法為 {namespace} 配置不衝突的 key: {normalized[:30]}')
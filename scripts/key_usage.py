@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+翻譯 key 使用索引與未使用 key 清理
+掃描 client/src 中所有 t('…') / t("…") / t(`…`)、pageKey="…"、樣板字串的 key 前綴（`ns.${id}`），
+以及內容就是 key 的字串常值（例如 regions 陣列中的 name: "region.americas"，之後以 t(region.name) 取用），
+找出 7 個語系檔中從未被引用的葉節點 key；預設只輸出報告，加上 --prune 才會從所有語系檔刪除
+
+i18next 的 key 以 "." 直接串接（不跳脫），所以第一層 key 本身含 "." 時（"home.t_a6ec6029"）與巢狀的 home → t_a6ec6029 視為同一個 key
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from atomic_output import STATS, write_json_if_changed
+from locale_table import LANG_FILES, LocaleTable, iter_leaves, join_path
+
+SOURCE_SUFFIXES = ('.tsx', '.ts', '.jsx', '.js')
+
+_KEY = r'[\w$-]+(?:\.[\w$-]+)*'
+_T_CALL_RE = re.compile(r'''\bt\(\s*(?:(['"])(''' + _KEY + r''')\1|`(''' + _KEY + r''')`)''')
+# t(`ns.${id}`)、`ns.section.${id}.title`：${ 之前的部分為前綴
+_TEMPLATE_PREFIX_RE = re.compile(r'`(' + _KEY + r'\.)\$\{')
+_PAGE_KEY_RE = re.compile(r'''\bpageKey=\{?\s*['"]([^'"]+)['"]''')
+_STRING_RE = re.compile(r'''(['"])(''' + _KEY + r''')\1''')
+# t(變數)、t(obj.name)：key 在執行期決定，只能靠字串常值規則涵蓋
+_DYNAMIC_T_RE = re.compile(r'''\bt\(\s*(?![\s'"`)])''')
+
+
+class DynamicCall(NamedTuple):
+    path: Path
+    line: int
+    snippet: str
+
+
+class KeyUsageIndex:
+    """client/src 中引用到的 key（完整 key 與前綴）"""
+
+    def __init__(self):
+        self.keys: Set[str] = set()  # t() 與 pageKey 的完整 key
+        self.literals: Set[str] = set()  # 其他字串常值，只在等於某個 key（或其上層路徑）時算作引用
+        self.prefixes: Set[str] = set()
+        self.page_keys: Set[str] = set()
+        self.dynamic: List[DynamicCall] = []
+        self.files = 0
+        self.calls = 0
+
+    @classmethod
+    def scan(cls, src_dir) -> 'KeyUsageIndex':
+        index = cls()
+        for path in sorted(Path(src_dir).rglob('*')):
+            if path.suffix in SOURCE_SUFFIXES and 'node_modules' not in path.parts:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index.add_source(path, f.read())
+        return index
+
+    def add_source(self, path: Path, content: str):
+        self.files += 1
+        for m in _T_CALL_RE.finditer(content):
+            self.keys.add(m.group(2) or m.group(3))
+            self.calls += 1
+        self.prefixes.update(_TEMPLATE_PREFIX_RE.findall(content))
+        page_keys = _PAGE_KEY_RE.findall(content)
+        self.page_keys.update(page_keys)
+        self.keys.update(page_keys)
+        self.literals.update(m.group(2) for m in _STRING_RE.finditer(content))
+        for m in _DYNAMIC_T_RE.finditer(content):
+            line = content.count('\n', 0, m.start()) + 1
+            snippet = content[m.start():content.find(')', m.start()) + 1][:60]
+            self.dynamic.append(DynamicCall(path, line, snippet))
+
+    def is_used(self, parts: Tuple[str, ...]) -> bool:
+        """葉節點本身、或它的任一上層路徑被引用（t('ns.obj', { returnObjects: true })）"""
+        key = '.'.join(parts)
+        if any(key.startswith(prefix) for prefix in self.prefixes):
+            return True
+        for i in range(len(parts), 0, -1):
+            ancestor = '.'.join(parts[:i])
+            if ancestor in self.keys or (ancestor in self.literals and '.' in ancestor):
+                return True
+        return False
+
+    def missing(self, data: dict) -> Set[str]:
+        """t() 引用了但語系檔中沒有的 key"""
+        present = set()
+        for parts, _ in iter_leaves(data):
+            for i in range(1, len(parts) + 1):
+                present.add('.'.join(parts[:i]))
+        return {key for key in self.keys - self.page_keys if key not in present}
+
+
+class LanguageReport(NamedTuple):
+    lng: str
+    total: int
+    unused: Dict[str, str]  # {join_path 路徑: t() key}
+    bytes_before: int
+    bytes_after: int
+
+
+def compact_size(data: dict) -> int:
+    return len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def find_unused(index: KeyUsageIndex, data: dict, keep: Tuple[str, ...]) -> Dict[str, str]:
+    unused = {}
+    for parts, _ in iter_leaves(data):
+        key = '.'.join(parts)
+        if not index.is_used(parts) and not key.startswith(keep):
+            unused[join_path(parts)] = key
+    return unused
+
+
+def main():
+    parser = argparse.ArgumentParser(description='找出（並刪除）程式碼中沒有引用的翻譯 key')
+    parser.add_argument('--src-dir', default='client/src', help='前端原始碼目錄（預設從專案根目錄執行）')
+    parser.add_argument('--locale-dir', default='client/src/i18n/locales', help='語系檔目錄')
+    parser.add_argument('--keep', action='append', default=[], metavar='PREFIX',
+                        help='一律保留的 key 前綴（執行期才組出的 key），可重複指定')
+    parser.add_argument('--prune', action='store_true', help='從所有語系檔刪除未使用的 key')
+    parser.add_argument('--report', help='把未使用 key 清單寫成 JSON')
+    parser.add_argument('--show-dynamic', action='store_true', help='列出所有 t(變數) 呼叫位置')
+    args = parser.parse_args()
+
+    index = KeyUsageIndex.scan(args.src_dir)
+    print(f'🔍 掃描 {index.files} 個檔案：t() 呼叫 {index.calls} 處、'
+          f'key {len(index.keys)} 個、樣板前綴 {len(index.prefixes)} 個、pageKey {len(index.page_keys)} 個')
+    if index.dynamic:
+        print(f'   ⚠️  {len(index.dynamic)} 處 t(變數) 呼叫，key 以字串常值規則判斷（--show-dynamic 列出）')
+        if args.show_dynamic:
+            for call in index.dynamic:
+                print(f'      {call.path}:{call.line}  {call.snippet}')
+
+    keep = tuple(args.keep)
+    reports: List[LanguageReport] = []
+    missing: Set[str] = set()
+    by_namespace: Counter = Counter()
+    locale_dir = Path(args.locale_dir)
+    for lng, name in LANG_FILES.items():
+        path = locale_dir / f'{name}.json'
+        if not path.exists():
+            print(f'   ⚠️  找不到 {path}，略過 {lng}')
+            continue
+        table = LocaleTable.load(path)
+        data = table.to_dict()
+        unused = find_unused(index, data, keep)
+        missing |= index.missing(data)
+        by_namespace.update(key.split('.', 1)[0] for key in unused.values())
+
+        before = compact_size(data)
+        for flat_path in unused:
+            table.delete(flat_path)
+        after = compact_size(table.to_dict())
+        reports.append(LanguageReport(lng, len(table) + len(unused), unused, before, after))
+        if args.prune and unused:
+            table.save(path)
+
+    print(f'\n{"語言":<8}{"key 數":>8}{"未使用":>8}{"可省 KB":>10}')
+    for report in reports:
+        saved = (report.bytes_before - report.bytes_after) / 1024
+        print(f'{report.lng:<8}{report.total:>8}{len(report.unused):>8}{saved:>10.1f}')
+    total_saved = sum(r.bytes_before - r.bytes_after for r in reports) / 1024
+    print(f'📉 7 語系合計可省 {total_saved:.1f} KB（不縮排 JSON）')
+    if by_namespace:
+        top = '、'.join(f'{ns} {count}' for ns, count in by_namespace.most_common(8))
+        print(f'   未使用 key 最多的 namespace: {top}')
+    if missing:
+        print(f'⚠️  程式碼引用但部分語系檔沒有的 key: {len(missing)} 個（例如 {", ".join(sorted(missing)[:3])}）')
+
+    if args.report:
+        write_json_if_changed(args.report, {r.lng: sorted(r.unused.values()) for r in reports}, ensure_ascii=False)
+        print(f'📝 報告已寫入 {args.report}')
+    if args.prune:
+        print('🗑️  已從語系檔刪除未使用的 key')
+        print(STATS.summary())
+    else:
+        print('ℹ️  僅報告，加上 --prune 才會修改語系檔')
+
+
+if __name__ == '__main__':
+    main()
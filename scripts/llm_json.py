@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+容錯的 LLM 回應 JSON 解析
+回應可能包在 ```json 區塊或前後有說明文字，也可能因輸出上限被截斷；
+逐一解析物件中的 key/value，截斷處之前所有完整的項目都會保留，只有缺少的 key 需要重送
+"""
+
+import json
+import re
+from typing import NamedTuple
+
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)(?:```|$)', re.DOTALL)
+# 物件開頭：{ 之後接著 key 的引號或直接結束
+_OBJECT_START_RE = re.compile(r'\{\s*(?:"|\})')
+_WS = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class SalvageResult(NamedTuple):
+    values: dict
+    complete: bool  # 整個物件完整解析（沒有截斷或格式錯誤）
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WS:
+        pos += 1
+    return pos
+
+
+def _strip_wrapping(content: str) -> str:
+    """去掉 markdown code fence 與物件之前的說明文字"""
+    fence = _FENCE_RE.search(content)
+    if fence:
+        content = fence.group(1)
+    start = _OBJECT_START_RE.search(content)
+    return content[start.start():] if start else ''
+
+
+def salvage_json_object(content: str) -> SalvageResult:
+    """解析 JSON 物件，遇到截斷或錯誤時回傳目前為止所有完整的 key/value"""
+    text = _strip_wrapping(content)
+    if not text:
+        return SalvageResult({}, False)
+
+    # 快速路徑：完整合法的 JSON
+    try:
+        values, _ = _decoder.raw_decode(text)
+        if isinstance(values, dict):
+            return SalvageResult(values, True)
+    except ValueError:
+        pass
+
+    values = {}
+    pos = _skip_ws(text, 1)
+    try:
+        while pos < len(text):
+            if text[pos] == '}':
+                return SalvageResult(values, True)
+            if text[pos] != '"':
+                break
+            key, pos = json.decoder.scanstring(text, pos + 1)
+            pos = _skip_ws(text, pos)
+            if text[pos] != ':':
+                break
+            value, pos = _decoder.raw_decode(text, _skip_ws(text, pos + 1))
+            pos = _skip_ws(text, pos)
+            # value 之後必須是 , 或 }：截斷在數字中間時（12 → 1）raw_decode 仍會成功，不能採用
+            if text[pos] not in ',}':
+                break
+            values[key] = value
+            if text[pos] == ',':
+                pos = _skip_ws(text, pos + 1)
+    except (ValueError, IndexError):
+        # 截斷在 key、冒號或 value 中間：這一項不完整，捨棄
+        pass
+    return SalvageResult(values, False)
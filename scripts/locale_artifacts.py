@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+語系檔的發佈產物
+不縮排的 JSON、內容雜湊檔名（{名稱}.{hash}.json，內容不變檔名就不變，可設定 immutable 長快取），
+並預先產生 .gz 與 .br，伺服器直接送出壓縮檔，不必每個請求重新壓縮
+brotli 為選用套件（pip install brotli），沒有安裝時只產生 .gz
+"""
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable
+
+from atomic_output import write_bytes_if_changed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HASH_LENGTH = 10
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+_ARTIFACT_SUFFIXES = ('.json',) + tuple('.json' + suffix for suffix in COMPRESSED_SUFFIXES)
+
+
+def minified_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    # mtime 固定為 0，相同內容產生相同的 .gz（不因重新建置而變動）
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def write_artifact(directory: Path, stem: str, data: bytes, hashed: bool = True, compress: bool = True) -> Dict[str, object]:
+    """寫出 {stem}.{hash}.json（hashed=False 時為 {stem}.json）與壓縮檔，回傳 manifest 項目 {file, bytes, gz, br}"""
+    name = f'{stem}.{content_hash(data)}.json' if hashed else f'{stem}.json'
+    path = Path(directory) / name
+    write_bytes_if_changed(path, data)
+    entry: Dict[str, object] = {'file': name, 'bytes': len(data)}
+    if compress:
+        gz = gzip_bytes(data)
+        write_bytes_if_changed(path.with_name(name + '.gz'), gz)
+        entry['gz'] = len(gz)
+        if brotli is not None:
+            br = brotli.compress(data, quality=BROTLI_QUALITY)
+            write_bytes_if_changed(path.with_name(name + '.br'), br)
+            entry['br'] = len(br)
+    return entry
+
+
+def artifact_files(entry: Dict[str, object]) -> list:
+    """write_artifact 實際寫出的檔名"""
+    name = entry['file']
+    return [name] + [name + suffix for suffix in COMPRESSED_SUFFIXES if suffix[1:] in entry]
+
+
+def remove_stale(directory: Path, keep: Iterable[str]) -> int:
+    """刪除 directory 中不在 keep 內的 .json 與壓縮檔（舊雜湊版本、已停用的壓縮格式）；回傳刪除數量"""
+    directory = Path(directory)
+    if not directory.exists():
+        return 0
+    keep = set(keep)
+    removed = 0
+    for path in directory.iterdir():
+        if path.is_file() and path.name.endswith(_ARTIFACT_SUFFIXES) and path.name not in keep:
+            path.unlink()
+            removed += 1
+    return removed
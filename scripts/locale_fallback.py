@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+建置時的語系 fallback 解析
+config.ts 設定 fallbackLng: 'zh-TW'，各語言缺少的 key 由 i18next 在 render 時逐一 fallback；
+translate_all_langs 也略過 admin* namespace，所以 cn/jp/ko/de/fr 都有缺口，部分 key 仍是 "[EN] 原文" 佔位符
+
+這裡依明確的 fallback 順序把每個語言補成完整的語系檔（key 與主語系相同、順序相同），
+佔位符視為缺少並標記出來，同時輸出各語言的覆蓋率報告；--fail-under 可讓覆蓋率退步在建置時就失敗
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from atomic_output import STATS, write_json_if_changed
+from locale_table import FALLBACK_LNG, LANG_FILES, is_placeholder, iter_leaves, join_path, unflatten
+
+# 缺少的 key 依序從這些語言取值（只取對方自己的譯文，不取對方 fallback 來的值）
+FALLBACK_CHAINS = {
+    'zh-TW': [],
+    'zh-CN': ['zh-TW'],
+    'en': ['zh-TW'],
+    'ja': ['en', 'zh-TW'],
+    'ko': ['en', 'zh-TW'],
+    'de': ['en', 'zh-TW'],
+    'fr': ['en', 'zh-TW'],
+}
+# 與目前 i18next 執行期行為相同：一律 fallback 到主語系
+RUNTIME_CHAINS = {lng: [] if lng == FALLBACK_LNG else [FALLBACK_LNG] for lng in LANG_FILES}
+POLICIES = {'default': FALLBACK_CHAINS, 'runtime': RUNTIME_CHAINS}
+
+
+class Coverage(NamedTuple):
+    lng: str
+    total: int  # 主語系的 key 數
+    translated: int  # 本身就有譯文（不含佔位符）
+    filled: Counter  # {來源語言: 補上的 key 數}
+    placeholders: List[str]
+    unresolved: List[str]  # 整條 fallback 順序都沒有值
+    missing_by_namespace: Counter
+    extra: int  # 主語系沒有、只存在於這個語言的 key（保留）
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.translated / self.total if self.total else 100.0
+
+    def to_dict(self) -> dict:
+        return {
+            'total': self.total,
+            'translated': self.translated,
+            'coverage': round(self.percent, 2),
+            'filled': dict(self.filled),
+            'placeholders': self.placeholders,
+            'unresolved': self.unresolved,
+            'missingByNamespace': dict(self.missing_by_namespace.most_common()),
+            'extra': self.extra,
+        }
+
+
+class Leaves:
+    """一個語言的葉節點；先以完整路徑比對，找不到再以 t() key（"." 直接串接）比對，
+    所以第一層含 "." 的 key（"home.t_a6ec6029"）與巢狀寫法 home → t_a6ec6029 視為同一個 key"""
+
+    def __init__(self, data: dict):
+        self.items: List[Tuple[Tuple[str, ...], object]] = list(iter_leaves(data))
+        self.exact = {join_path(parts): value for parts, value in self.items}
+        self.dotted: Dict[str, object] = {}
+        for parts, value in self.items:
+            self.dotted.setdefault('.'.join(parts), value)
+
+    def __contains__(self, parts: Tuple[str, ...]):
+        return join_path(parts) in self.exact or '.'.join(parts) in self.dotted
+
+    def get(self, parts: Tuple[str, ...]):
+        path = join_path(parts)
+        if path in self.exact:
+            return self.exact[path]
+        return self.dotted.get('.'.join(parts))
+
+
+def usable(value) -> bool:
+    return value is not None and not is_placeholder(value)
+
+
+def load_locales(locale_dir) -> Dict[str, dict]:
+    locales = {}
+    for lng, name in LANG_FILES.items():
+        path = Path(locale_dir) / f'{name}.json'
+        if not path.exists():
+            print(f'   ⚠️  找不到 {path}，略過 {lng}')
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            locales[lng] = json.load(f)
+    return locales
+
+
+def resolve_language(lng: str, leaves: Dict[str, Leaves], chain: List[str]) -> Tuple[dict, Coverage]:
+    master, own = leaves[FALLBACK_LNG], leaves.get(lng) or Leaves({})
+    flat = {}
+    translated = 0
+    filled, missing_by_namespace = Counter(), Counter()
+    placeholders, unresolved = [], []
+    for parts, master_value in master.items:
+        key = '.'.join(parts)
+        value = own.get(parts)
+        if usable(value):
+            translated += 1
+            flat[join_path(parts)] = value
+            continue
+        if is_placeholder(value):
+            placeholders.append(key)
+        missing_by_namespace[parts[0].split('.', 1)[0]] += 1
+        source = next((src for src in chain if src in leaves and usable(leaves[src].get(parts))), None)
+        if source is None:
+            unresolved.append(key)
+            # 主語系本身也是佔位符時原樣保留，不讓 key 消失
+            flat[join_path(parts)] = value if value is not None else master_value
+            continue
+        filled[source] += 1
+        flat[join_path(parts)] = leaves[source].get(parts)
+
+    extra = 0
+    for parts, value in own.items:
+        if parts not in master:
+            extra += 1
+            flat[join_path(parts)] = value
+    coverage = Coverage(lng, len(master.items), translated, filled, placeholders, unresolved, missing_by_namespace, extra)
+    return unflatten(flat), coverage
+
+
+def resolve_locales(locales: Dict[str, dict], chains: Dict[str, List[str]] = FALLBACK_CHAINS) -> Dict[str, Tuple[dict, Coverage]]:
+    """{語言: (補齊後的語系資料, 覆蓋率)}；需要包含主語系 FALLBACK_LNG"""
+    leaves = {lng: Leaves(data) for lng, data in locales.items()}
+    return {lng: resolve_language(lng, leaves, chains.get(lng, [FALLBACK_LNG])) for lng in locales}
+
+
+def print_coverage(coverages: List[Coverage]):
+    print(f'\n{"語言":<8}{"覆蓋率":>8}{"譯文":>7}{"補齊":>7}{"佔位符":>7}{"無值":>6}  補齊來源')
+    for c in coverages:
+        sources = '、'.join(f'{src} {n}' for src, n in c.filled.most_common()) or '-'
+        print(f'{c.lng:<8}{c.percent:>7.1f}%{c.translated:>7}{sum(c.filled.values()):>7}'
+              f'{len(c.placeholders):>7}{len(c.unresolved):>6}  {sources}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='依 fallback 順序補齊各語言的語系檔並輸出覆蓋率報告')
+    parser.add_argument('--locale-dir', default='client/src/i18n/locales', help='語系檔目錄（預設從專案根目錄執行）')
+    parser.add_argument('--out-dir', help='補齊後的語系檔輸出目錄（不指定則只輸出報告）')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='default',
+                        help='default：jp/ko/de/fr 先取英文再取繁中；runtime：與 i18next 相同，一律取繁中')
+    parser.add_argument('--report', help='覆蓋率報告 JSON 的輸出路徑')
+    parser.add_argument('--fail-under', type=float, metavar='PCT', help='任一語言的覆蓋率低於此值時以狀態碼 1 結束')
+    args = parser.parse_args()
+
+    locales = load_locales(args.locale_dir)
+    if FALLBACK_LNG not in locales:
+        sys.exit(f'❌ 找不到主語系 {FALLBACK_LNG}')
+    resolved = resolve_locales(locales, POLICIES[args.policy])
+    coverages = [coverage for _, coverage in resolved.values()]
+    print_coverage(coverages)
+
+    if args.out_dir:
+        for lng, (data, _) in resolved.items():
+            write_json_if_changed(Path(args.out_dir) / f'{LANG_FILES[lng]}.json', data)
+        print(STATS.summary())
+    if args.report:
+        write_json_if_changed(args.report, {c.lng: c.to_dict() for c in coverages})
+        print(f'📝 報告已寫入 {args.report}')
+
+    if args.fail_under is not None:
+        failing = [c.lng for c in coverages if c.percent < args.fail_under]
+        if failing:
+            sys.exit(f'❌ 覆蓋率低於 {args.fail_under}%: {", ".join(failing)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+語系檔的扁平化資料層
+任意深度的語系 JSON 攤平成 {點分路徑: 值} 的有序表，取值/寫入/差異比對都以葉節點為單位，寫回時還原成原本的巢狀結構與 key 順序
+key 本身含有 "." 時（例如 "home.t_a6ec6029"）在路徑中跳脫為 "\\."，來回轉換不會失真
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from atomic_output import write_json_if_changed
+
+# 與 client/src/i18n/config.ts 的 resources 相同：i18next 語言代碼 → 語系檔名稱
+LANG_FILES = {
+    'zh-TW': 'tw',
+    'zh-CN': 'cn',
+    'en': 'en',
+    'ja': 'jp',
+    'ko': 'ko',
+    'de': 'de',
+    'fr': 'fr',
+}
+FALLBACK_LNG = 'zh-TW'
+# batch_translate_all / universal_fixer 寫入英文語系檔的暫時值："[EN] 原文"
+PLACEHOLDER_PREFIX = '[EN]'
+
+SEP = '.'
+_ESCAPE = '\\'
+
+
+def is_placeholder(value) -> bool:
+    return isinstance(value, str) and value.startswith(PLACEHOLDER_PREFIX)
+
+
+def escape_key(key: str) -> str:
+    return key.replace(_ESCAPE, _ESCAPE * 2).replace(SEP, _ESCAPE + SEP)
+
+
+def join_path(parts) -> str:
+    return SEP.join(escape_key(part) for part in parts)
+
+
+def split_path(path: str) -> List[str]:
+    """join_path 的反向：依未跳脫的 "." 切開"""
+    if _ESCAPE not in path:
+        return path.split(SEP)
+    parts, current, i = [], [], 0
+    while i < len(path):
+        ch = path[i]
+        if ch == _ESCAPE and i + 1 < len(path):
+            current.append(path[i + 1])
+            i += 2
+            continue
+        if ch == SEP:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    parts.append(''.join(current))
+    return parts
+
+
+def iter_leaves(data: dict) -> Iterator[Tuple[Tuple[str, ...], object]]:
+    """依檔案順序（深度優先）產生 (key 路徑 tuple, 葉節點值)；空物件本身視為葉節點，以便原樣還原"""
+    stack = [((), iter(data.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for key, value in items:
+            parts = prefix + (key,)
+            if isinstance(value, dict) and value:
+                stack.append((parts, iter(value.items())))
+                break
+            yield parts, value
+        else:
+            stack.pop()
+
+
+def flatten(data: dict) -> Dict[str, object]:
+    return {join_path(parts): value for parts, value in iter_leaves(data)}
+
+
+def namespace_of(path: str) -> str:
+    return split_path(path)[0]
+
+
+def unflatten(flat: Dict[str, object]) -> dict:
+    """依表中順序重建巢狀結構；路徑中間節點原本是字串時以物件取代"""
+    root: dict = {}
+    for path, value in flat.items():
+        parts = split_path(path)
+        node = root
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        node[parts[-1]] = value
+    return root
+
+
+class LocaleDiff(NamedTuple):
+    added: Dict[str, object]
+    removed: Dict[str, object]
+    changed: Dict[str, Tuple[object, object]]  # {路徑: (舊值, 新值)}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def describe(self) -> str:
+        return f'新增 {len(self.added)}、刪除 {len(self.removed)}、修改 {len(self.changed)}'
+
+
+class LocaleTable:
+    """語系檔的扁平表；路徑為 join_path 產生的點分字串"""
+
+    def __init__(self, data: dict = None):
+        self.flat: Dict[str, object] = flatten(data or {})
+
+    @classmethod
+    def load(cls, path) -> 'LocaleTable':
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def save(self, path, **kwargs) -> bool:
+        """有變更才寫回，回傳是否寫入"""
+        return write_json_if_changed(path, self.to_dict(), **kwargs)
+
+    def to_dict(self) -> dict:
+        return unflatten(self.flat)
+
+    def __len__(self):
+        return len(self.flat)
+
+    def __contains__(self, path: str):
+        return path in self.flat
+
+    def items(self):
+        return self.flat.items()
+
+    def get(self, path: str, default=None):
+        return self.flat.get(path, default)
+
+    def set(self, path: str, value):
+        """寫入葉節點；新路徑在還原時排在同一層既有 key 之後"""
+        if isinstance(value, dict) and value:
+            self.merge(path, value)
+            return
+        if path not in self.flat:
+            self._drop_ancestors(path)
+        self.flat[path] = value
+
+    def _drop_ancestors(self, path: str):
+        """上層路徑原本是葉節點（字串或空物件）時移除，改由新的子節點取代"""
+        parts = split_path(path)
+        for i in range(1, len(parts)):
+            self.flat.pop(join_path(parts[:i]), None)
+
+    def delete(self, path: str):
+        self.flat.pop(path, None)
+
+    def subtree(self, prefix: str) -> Dict[str, object]:
+        """prefix 之下的所有葉節點"""
+        start = prefix + SEP
+        return {path: value for path, value in self.flat.items() if path == prefix or path.startswith(start)}
+
+    def merge(self, prefix: str, data: dict) -> LocaleDiff:
+        """把巢狀物件逐葉寫到 prefix 之下，prefix 下原有但 data 沒有的葉節點保留；回傳差異"""
+        before = self.subtree(prefix)
+        # 原本是字串（或空物件）的位置改為物件
+        self.flat.pop(prefix, None)
+        self._drop_ancestors(prefix)
+        for parts, value in iter_leaves(data):
+            self.flat[prefix + SEP + join_path(parts)] = value
+        return diff_flat(before, self.subtree(prefix))
+
+    def diff(self, other: 'LocaleTable') -> LocaleDiff:
+        """self → other 的差異"""
+        return diff_flat(self.flat, other.flat)
+
+
+def diff_flat(old: Dict[str, object], new: Dict[str, object]) -> LocaleDiff:
+    added = {path: value for path, value in new.items() if path not in old}
+    removed = {path: value for path, value in old.items() if path not in new}
+    changed = {path: (old[path], value) for path, value in new.items() if path in old and old[path] != value}
+    return LocaleDiff(added, removed, changed)
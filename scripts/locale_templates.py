@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+i18next 插值字串的預先編譯與跨語言變數檢查
+"找到 {{count}} 個授權經銷商" 這類字串每次 render 都要以 regex 解析 {{…}}；
+建置時先切成 ["找到 ", ["count"], " 個授權經銷商"]（字串為文字片段、陣列為 [變數名稱, 格式]），
+前端只需依序串接，不必在列表頁反覆解析；{{- name}} 不跳脫的變數在陣列最後加上 true（["name", true]）
+
+複數形（key_one / key_other …）以去掉字尾的 key 為一組；各語言的複數形數量不同（ja 只有 _other），
+所以變數集合以整組的聯集比較
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Set, Union
+
+from atomic_output import STATS, write_json_if_changed
+from locale_fallback import load_locales
+from locale_table import FALLBACK_LNG, LANG_FILES, iter_leaves
+
+# {{count}}、{{count, number}}、{{- name}}（不跳脫）
+TEMPLATE_RE = re.compile(r'\{\{\s*(-\s*)?([\w.$-]+)\s*(?:,\s*([^{}]*?)\s*)?\}\}')
+# i18next v21 的複數字尾（_plural 為 v3 以前的寫法）
+PLURAL_SUFFIXES = ('zero', 'one', 'two', 'few', 'many', 'other', 'plural')
+_PLURAL_RE = re.compile(r'^(.+)_(' + '|'.join(PLURAL_SUFFIXES) + r')$')
+
+# 文字片段為字串，變數為 [名稱] 或 [名稱, 格式]，不跳脫的變數最後加上 true
+Segment = Union[str, List[Union[str, bool]]]
+
+
+class VariableMismatch(NamedTuple):
+    key: str  # 複數形以去掉字尾的 key 表示
+    lng: str
+    expected: Set[str]  # 主語系的變數
+    actual: Set[str]
+
+    def describe(self) -> str:
+        missing = ', '.join(sorted(self.expected - self.actual)) or '-'
+        extra = ', '.join(sorted(self.actual - self.expected)) or '-'
+        return f'{self.lng} {self.key}：缺少 {missing}，多出 {extra}'
+
+
+def compile_template(text: str) -> List[Segment]:
+    """切成文字片段與變數；沒有插值時回傳 [text]"""
+    segments: List[Segment] = []
+    pos = 0
+    for m in TEMPLATE_RE.finditer(text):
+        if m.start() > pos:
+            segments.append(text[pos:m.start()])
+        slot: List[Union[str, bool]] = [m.group(2)]
+        if m.group(3):
+            slot.append(m.group(3))
+        if m.group(1):
+            slot.append(True)
+        segments.append(slot)
+        pos = m.end()
+    if pos < len(text):
+        segments.append(text[pos:])
+    return segments
+
+
+def variables(segments: List[Segment]) -> Set[str]:
+    return {segment[0] for segment in segments if isinstance(segment, list)}
+
+
+def is_malformed(text: str) -> bool:
+    """移除合法的 {{…}} 之後仍有 {{ 或 }}（例如模型把 {{count}} 譯成 {{ 數量 }} 或少了括號）"""
+    rest = TEMPLATE_RE.sub('', text)
+    return '{{' in rest or '}}' in rest
+
+
+def plural_base(key: str) -> str:
+    m = _PLURAL_RE.match(key)
+    return m.group(1) if m else key
+
+
+def collect_templates(data: dict) -> Dict[str, List[Segment]]:
+    """{t() key: 片段}，只包含有插值的字串"""
+    templates = {}
+    for parts, value in iter_leaves(data):
+        if isinstance(value, str) and '{{' in value:
+            segments = compile_template(value)
+            if variables(segments):
+                templates.setdefault('.'.join(parts), segments)
+    return templates
+
+
+def group_variables(templates: Dict[str, List[Segment]]) -> Dict[str, Set[str]]:
+    """{key 或複數組: 變數聯集}"""
+    groups: Dict[str, Set[str]] = {}
+    for key, segments in templates.items():
+        groups.setdefault(plural_base(key), set()).update(variables(segments))
+    return groups
+
+
+def plural_keys(data: dict) -> Dict[str, List[str]]:
+    """{複數組: [字尾, ...]}"""
+    groups: Dict[str, List[str]] = {}
+    for parts, value in iter_leaves(data):
+        key = '.'.join(parts)
+        m = _PLURAL_RE.match(key)
+        if m and isinstance(value, str):
+            groups.setdefault(m.group(1), []).append(m.group(2))
+    return groups
+
+
+def validate_variables(templates: Dict[str, Dict[str, List[Segment]]], present: Dict[str, Set[str]]) -> List[VariableMismatch]:
+    """以主語系為準比較各語言的變數集合；present 為各語言存在的 key 組（沒有譯文的 key 交給 fallback，不算不一致）"""
+    expected = group_variables(templates.get(FALLBACK_LNG, {}))
+    mismatches = []
+    for lng, lng_templates in templates.items():
+        if lng == FALLBACK_LNG:
+            continue
+        actual = group_variables(lng_templates)
+        for key in sorted(set(expected) | set(actual)):
+            if key not in present[lng] or key not in present[FALLBACK_LNG]:
+                continue
+            if expected.get(key, set()) != actual.get(key, set()):
+                mismatches.append(VariableMismatch(key, lng, expected.get(key, set()), actual.get(key, set())))
+    return mismatches
+
+
+def present_groups(data: dict) -> Set[str]:
+    return {plural_base('.'.join(parts)) for parts, value in iter_leaves(data) if isinstance(value, str)}
+
+
+def malformed_keys(data: dict) -> List[str]:
+    return ['.'.join(parts) for parts, value in iter_leaves(data) if isinstance(value, str) and is_malformed(value)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='預先編譯 i18next 插值字串並檢查各語言的變數是否一致')
+    parser.add_argument('--locale-dir', default='client/src/i18n/locales', help='語系檔目錄（預設從專案根目錄執行）')
+    parser.add_argument('--out-dir', help='輸出 {語言}.templates.json 的目錄（不指定則只檢查）')
+    parser.add_argument('--strict', action='store_true', help='變數不一致或 {{ }} 格式錯誤時以狀態碼 1 結束')
+    args = parser.parse_args()
+
+    locales = load_locales(args.locale_dir)
+    if FALLBACK_LNG not in locales:
+        sys.exit(f'❌ 找不到主語系 {FALLBACK_LNG}')
+    templates = {lng: collect_templates(data) for lng, data in locales.items()}
+    present = {lng: present_groups(data) for lng, data in locales.items()}
+    for lng, lng_templates in templates.items():
+        plurals = plural_keys(locales[lng])
+        print(f'   🧩 {lng}: {len(lng_templates)} 個插值字串、{len(plurals)} 組複數形')
+        if args.out_dir:
+            write_json_if_changed(Path(args.out_dir) / f'{LANG_FILES[lng]}.templates.json', lng_templates)
+
+    mismatches = validate_variables(templates, present)
+    malformed = {lng: keys for lng, keys in ((lng, malformed_keys(data)) for lng, data in locales.items()) if keys}
+    for mismatch in mismatches:
+        print(f'   ❌ 變數不一致 {mismatch.describe()}')
+    for lng, keys in malformed.items():
+        print(f'   ❌ {lng} 的 {{{{ }}}} 格式錯誤: {", ".join(keys[:5])}{" …" if len(keys) > 5 else ""}')
+    if not mismatches and not malformed:
+        print('✅ 各語言的插值變數一致')
+    if args.out_dir:
+        print(STATS.summary())
+    if args.strict and (mismatches or malformed):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
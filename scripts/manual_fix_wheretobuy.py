@@ -3,9 +3,11 @@
 手動修復 WhereToBuy 頁面的翻譯整合
 """
 
-import re
 from pathlib import Path
 
+from atomic_output import STATS, write_text_if_changed
+from rule_rewriter import RuleSet
+
 # 文件路徑
 PAGE_FILE = Path('/home/ubuntu/apolnus/client/src/pages/WhereToBuy.tsx')
 
@@ -51,12 +53,16 @@ replacements = [
     (r'>\s*營業時間\s*<', r">{t('whereToBuy.dealers.hours')}<"),
 ]
 
-# 執行替換
-for pattern, replacement in replacements:
-    content = re.sub(pattern, replacement, content)
+# 執行替換（所有規則合併成一個 regex，單次掃描）
+rules = RuleSet(replacements)
+new_content, hits = rules.apply(content)
 
-# 保存文件
-with open(PAGE_FILE, 'w', encoding='utf-8') as f:
-    f.write(content)
+# 保存文件（內容沒變時不寫入）
+write_text_if_changed(PAGE_FILE, new_content)
 
 print("✅ WhereToBuy 頁面翻譯整合完成")
+print(f"📊 {sum(1 for count in hits if count)}/{len(hits)} 條規則命中，共替換 {sum(hits)} 處")
+for line, count in zip(rules.report(hits), hits):
+    if not count:
+        print(f"   ⚠️  未命中: {line}")
+print(STATS.summary())
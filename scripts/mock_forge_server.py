@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+本機模擬的 Forge / OpenAI 相容 /v1/chat/completions
+不需要 API key 與網路即可測試翻譯腳本的吞吐量：可設定延遲分布、注入 5xx / 429、回傳被截斷或包在 markdown 中的 JSON
+「譯文」為原文加上 MOCK_PREFIX，腳本照常寫回語系檔
+
+單獨執行：python3 scripts/mock_forge_server.py --port 8787 --latency 0.8 --rate-429 0.05
+再以 BUILT_IN_FORGE_API_URL=http://127.0.0.1:8787 BUILT_IN_FORGE_API_KEY=mock 執行翻譯腳本
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+MOCK_PREFIX = '⟦mock⟧ '
+
+# translate_with_ai 把輸入 JSON 夾在 prompt 中間
+_EMBEDDED_INPUT_RE = re.compile(r'Input JSON:\s*(\{.*\})\s*Output JSON', re.DOTALL)
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.5  # 延遲中位數（秒）
+    sigma: float = 0.4  # 對數常態分布的 sigma，0 為固定延遲
+    error_rate: float = 0.0  # 回傳 500/502/503 的機率
+    rate_429: float = 0.0  # 隨機回傳 429 的機率
+    retry_after: float = 1.0  # 429 的 Retry-After 秒數
+    max_rps: float = 0.0  # 每秒超過這個請求數就回 429（0 為不限制），模擬供應商真正的上限
+    truncate_rate: float = 0.0  # 回傳被截斷 JSON 的機率（finish_reason=length）
+    markdown_rate: float = 0.0  # 以 ```json 包住回應的機率
+    seed: Optional[int] = None
+
+
+def mock_translate(value):
+    """原文加上前綴；巢狀物件逐一處理"""
+    if isinstance(value, dict):
+        return {k: mock_translate(v) for k, v in value.items()}
+    if isinstance(value, str):
+        return MOCK_PREFIX + value
+    return value
+
+
+def extract_input(messages: List[dict]) -> dict:
+    """從最後一則 user 訊息取出待翻譯的 JSON（整則訊息就是 JSON，或嵌在 prompt 中）"""
+    content = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+    try:
+        data = json.loads(content)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+    match = _EMBEDDED_INPUT_RE.search(content)
+    return json.loads(match.group(1)) if match else {}
+
+
+class MockForgeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig):
+        super().__init__(address, MockForgeHandler)
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.statuses = Counter()
+        self.latencies: List[float] = []  # 成功請求的處理秒數
+        self.items = 0
+        self._recent = deque()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def over_limit(self) -> bool:
+        """最近一秒內的請求數是否超過 max_rps"""
+        if not self.config.max_rps:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.config.max_rps:
+                return True
+            self._recent.append(now)
+            return False
+
+    def roll(self, probability: float) -> bool:
+        with self.lock:
+            return self.random.random() < probability
+
+    def sample_latency(self) -> float:
+        with self.lock:
+            if not self.config.sigma:
+                return self.config.latency
+            return self.config.latency * self.random.lognormvariate(0, self.config.sigma)
+
+    def record(self, status: int, latency: float = None, items: int = 0):
+        with self.lock:
+            self.statuses[status] += 1
+            if latency is not None:
+                self.latencies.append(latency)
+            self.items += items
+
+
+class MockForgeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    server: MockForgeServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes, headers: dict = None):
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) > 256:
+            body = gzip.compress(body)
+            headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: dict = None):
+        self.server.record(status)
+        self._reply(status, json.dumps({'error': {'message': message}}).encode('utf-8'), headers)
+
+    def do_GET(self):
+        if self.path != '/stats':
+            return self._error(404, 'not found')
+        server = self.server
+        with server.lock:
+            stats = {'statuses': dict(server.statuses), 'latencies': list(server.latencies), 'items': server.items}
+        self._reply(200, json.dumps(stats).encode('utf-8'))
+
+    def do_POST(self):
+        start = time.perf_counter()
+        server, config = self.server, self.server.config
+        raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            raw = gzip.decompress(raw)
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._error(404, f'unknown path {self.path}')
+
+        retry_after = {'Retry-After': f'{config.retry_after:g}'}
+        if server.over_limit() or server.roll(config.rate_429):
+            return self._error(429, 'rate limited', retry_after)
+
+        time.sleep(server.sample_latency())
+        if server.roll(config.error_rate):
+            with server.lock:
+                status = server.random.choice([500, 502, 503])
+            return self._error(status, 'injected server error')
+
+        try:
+            payload = json.loads(raw)
+            source = extract_input(payload.get('messages', []))
+        except ValueError as e:
+            return self._error(400, f'invalid request: {e}')
+
+        content = json.dumps(mock_translate(source), ensure_ascii=False)
+        finish_reason = 'stop'
+        if server.roll(config.truncate_rate):
+            content = content[:max(1, len(content) // 2)]
+            finish_reason = 'length'
+        elif server.roll(config.markdown_rate):
+            content = f'```json\n{content}\n```'
+
+        body = {
+            'id': 'mock-completion',
+            'object': 'chat.completion',
+            'model': payload.get('model', 'mock'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                         'finish_reason': finish_reason}],
+        }
+        server.record(200, time.perf_counter() - start, len(source))
+        self._reply(200, json.dumps(body, ensure_ascii=False).encode('utf-8'))
+
+
+def start_server(config: MockConfig, host: str = '127.0.0.1', port: int = 0) -> MockForgeServer:
+    """在背景 thread 啟動，port 0 為自動選擇"""
+    server = MockForgeServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    defaults = MockConfig()
+    parser.add_argument('--latency', type=float, default=defaults.latency, help='延遲中位數（秒）')
+    parser.add_argument('--sigma', type=float, default=defaults.sigma, help='對數常態延遲的 sigma（0 為固定延遲）')
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate, help='回傳 5xx 的機率')
+    parser.add_argument('--rate-429', type=float, default=defaults.rate_429, help='隨機回傳 429 的機率')
+    parser.add_argument('--retry-after', type=float, default=defaults.retry_after, help='429 的 Retry-After 秒數')
+    parser.add_argument('--max-rps', type=float, default=defaults.max_rps, help='每秒請求上限，超過回 429（0 為不限制）')
+    parser.add_argument('--truncate-rate', type=float, default=defaults.truncate_rate, help='回傳截斷 JSON 的機率')
+    parser.add_argument('--markdown-rate', type=float, default=defaults.markdown_rate, help='以 ```json 包住回應的機率')
+    parser.add_argument('--seed', type=int, default=None, help='亂數種子（重現同一組注入結果）')
+
+
+def config_from_args(args) -> MockConfig:
+    return MockConfig(
+        latency=args.latency, sigma=args.sigma, error_rate=args.error_rate, rate_429=args.rate_429,
+        retry_after=args.retry_after, max_rps=args.max_rps, truncate_rate=args.truncate_rate,
+        markdown_rate=args.markdown_rate, seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本機模擬 Forge chat-completions API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockForgeServer((args.host, args.port), config_from_args(args))
+    print(f'🧪 Mock Forge API: {server.url}/v1/chat/completions（GET {server.url}/stats 查看統計）')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
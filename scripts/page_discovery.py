@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+頁面探索與平行處理
+掃描整個 client/src 樹狀結構，並將每個檔案的處理工作分派到 ProcessPoolExecutor
+結果一律依路徑順序回傳，輸出與單執行緒執行完全一致
+"""
+
+import io
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from atomic_output import STATS
+
+
+class FileOutcome(NamedTuple):
+    item: object
+    result: object
+    output: str  # 處理過程中 print 的內容
+    error: Optional[str]  # 例外的 traceback，成功時為 None
+
+
+def discover_sources(src_dir, suffixes=('.tsx',)) -> List[Path]:
+    """遞迴列出 src_dir 下所有原始碼檔案，依相對路徑排序"""
+    src_dir = Path(src_dir)
+    files = [p for p in src_dir.rglob('*') if p.suffix in suffixes and p.is_file()]
+    return sorted(files, key=lambda p: p.relative_to(src_dir).as_posix())
+
+
+def source_id(path, src_dir) -> str:
+    """檔案的穩定識別字串，例如 pages/admin/AdminDealers"""
+    return Path(path).relative_to(src_dir).with_suffix('').as_posix()
+
+
+def page_path_parts(page_name: str) -> List[str]:
+    """
+    頁面名稱（固定清單中的 About，或 --all 的 source_id）去掉開頭 pages/ 後的各段
+    pages/About → ['About']（與固定清單相同）；pages/admin/AdminDealers → ['admin', 'AdminDealers']
+    """
+    parts = list(Path(page_name).parts)
+    if len(parts) > 1 and parts[0] == 'pages':
+        parts = parts[1:]
+    return parts
+
+
+def find_namespace_collisions(page_names: Iterable[str], namespace_of: Callable[[str], str]) -> Dict[str, List[str]]:
+    """{namespace: [頁面, ...]}，只列出對應到兩個以上頁面的 namespace"""
+    owners: Dict[str, List[str]] = {}
+    for page_name in page_names:
+        owners.setdefault(namespace_of(page_name), []).append(page_name)
+    return {namespace: pages for namespace, pages in owners.items() if len(pages) > 1}
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def add_parallel_arguments(parser):
+    """加入 --all / --workers 參數"""
+    parser.add_argument('--all', action='store_true',
+                        help='處理整個 client/src（含 pages/admin、pages/products、components），而非固定頁面清單')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='平行處理的 process 數（預設為 CPU 核心數，1 表示不開 process pool）')
+
+
+def _call_captured(func: Callable, item) -> tuple:
+    buf = io.StringIO()
+    result, error = None, None
+    snapshot = STATS.snapshot()
+    with redirect_stdout(buf):
+        try:
+            result = func(item)
+        except Exception:
+            error = traceback.format_exc()
+    return result, buf.getvalue(), error, STATS.since(snapshot)
+
+
+def run_parallel(func: Callable, items: Iterable, workers: int = 1) -> Iterator[FileOutcome]:
+    """
+    對每個 item 執行 func，依輸入順序逐一產出 FileOutcome
+    func 必須是模組層級函數（或其 functools.partial），才能傳給子 process
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            result, output, error, _ = _call_captured(func, item)
+            yield FileOutcome(item, result, output, error)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        for item, outcome in zip(items, pool.map(_call_captured, [func] * len(items), items)):
+            result, output, error, written = outcome
+            # 子 process 的寫入紀錄併回主程序，summary 才會包含所有檔案
+            STATS.merge(written)
+            yield FileOutcome(item, result, output, error)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+LLM API 共用的速率限制與重試
+Token bucket 控制整體請求速率（所有 thread 共用同一個 bucket），429/5xx/逾時以指數退避 + jitter 重試
+伺服器回傳 Retry-After 時，整個 bucket 暫停到指定時間，其他併發中的請求也一起等待，不會繼續撞 429
+"""
+
+import email.utils
+import http.client
+import os
+import random
+import socket
+import threading
+import time
+import urllib.error
+from typing import Callable, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# 預設速率可用環境變數調整（每秒請求數、可瞬間送出的請求數）
+DEFAULT_RATE = float(os.environ.get('FORGE_RATE_LIMIT', '4'))
+DEFAULT_BURST = int(os.environ.get('FORGE_RATE_BURST', '8'))
+DEFAULT_MAX_ATTEMPTS = 6
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+
+class RetryExhausted(Exception):
+    """暫時性錯誤重試到上限仍失敗；呼叫端應把批次排回佇列，而不是丟棄"""
+
+    def __init__(self, attempts: int, last_error: BaseException):
+        super().__init__(f'重試 {attempts} 次仍失敗: {last_error}')
+        self.attempts = attempts
+        self.last_error = last_error
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 可能是秒數或 HTTP 日期，回傳需等待的秒數"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def classify_error(exc: BaseException) -> Tuple[bool, Optional[float]]:
+    """回傳 (是否為可重試的暫時性錯誤, 伺服器要求的等待秒數)"""
+    if isinstance(exc, urllib.error.HTTPError):
+        if exc.code == 429 or exc.code >= 500:
+            headers = exc.headers
+            return True, parse_retry_after(headers.get('Retry-After') if headers else None)
+        return False, None
+    if isinstance(exc, (urllib.error.URLError, socket.timeout, TimeoutError,
+                        ConnectionError, http.client.HTTPException)):
+        return True, None
+    return False, None
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """full jitter：在 [0, min(cap, base × 2^(attempt-1))] 之間取亂數，避免併發請求同時重送"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class RateLimiter:
+    """
+    rate：每秒補充的請求數；burst：bucket 容量
+    token bucket 以 lock 保護，可在多個 thread 中共用
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.retries = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.configure(rate, burst)
+
+    def configure(self, rate: float, burst: int):
+        """調整速率（命令列參數覆寫預設值時使用）"""
+        with self._lock:
+            self.rate = max(rate, 0.01)
+            self.burst = max(1, burst)
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """取得一個請求名額，必要時阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """伺服器要求降速：在指定秒數內不發出任何請求，恢復後也不會一口氣用掉整個 burst"""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._paused_until)
+            self.throttled += 1
+
+    def call(self, func: Callable[..., T], *args, label: str = '', **kwargs) -> T:
+        """
+        經過速率限制呼叫 func；暫時性錯誤自動重試，其他錯誤直接拋出
+        重試到上限仍失敗時拋出 RetryExhausted
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.acquire()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                retryable, retry_after = classify_error(e)
+                if not retryable:
+                    raise
+                if attempt == self.max_attempts:
+                    raise RetryExhausted(attempt, e) from e
+
+                if retry_after is not None:
+                    # 依伺服器指示暫停整個 bucket，再加一點 jitter 錯開恢復後的請求
+                    self.pause(retry_after)
+                    delay = retry_after + random.uniform(0, BACKOFF_BASE)
+                else:
+                    delay = backoff_delay(attempt)
+                with self._lock:
+                    self.retries += 1
+                prefix = f'{label} ' if label else ''
+                print(f'   ⏳ {prefix}{e}，{delay:.1f} 秒後重試（第 {attempt}/{self.max_attempts - 1} 次）')
+                time.sleep(delay)
+
+    def summary(self) -> str:
+        return f'重試 {self.retries} 次，伺服器要求降速 {self.throttled} 次'
+
+
+# 同一個 process 內所有 LLM 呼叫共用
+LIMITER = RateLimiter()
@@ -2,12 +2,24 @@
 """
 升級版 Python 腳本：完成真正的文字替換工作
 使用 AST/Regex 雙重策略，自動生成 Keys，保護資料區塊
+
+平行處理分兩階段：子 process 先找出各頁面需要翻譯的文字，主程序依頁面順序配置 key
+（相同文字沿用同一個 key，結果與 --workers 無關），子 process 再依配置結果替換並寫回檔案
 """
 
 import re
+import sys
 import json
+import argparse
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from atomic_output import STATS, write_text_if_changed
+from exclusion_index import ExclusionIndex, build_exclusion_index
+from page_discovery import (add_parallel_arguments, discover_sources, find_namespace_collisions, page_path_parts,
+                            run_parallel, source_id)
+from key_allocator import KeyAllocator, KeyCollisionError
+from text_key_index import TextKeyIndex
 
 # 目標頁面列表
 TARGET_PAGES = [
@@ -29,6 +41,7 @@ TARGET_PAGES = [
 
 # 頁面路徑
 PAGES_DIR = Path('/home/ubuntu/apolnus/client/src/pages')
+SRC_DIR = PAGES_DIR.parent
 TRANSLATIONS_DIR = Path('/home/ubuntu/apolnus/client/src/i18n/locales')
 
 # 載入現有翻譯
@@ -38,6 +51,14 @@ with open(TRANSLATIONS_DIR / 'zh-TW.json', 'r', encoding='utf-8') as f:
 with open(TRANSLATIONS_DIR / 'en.json', 'r', encoding='utf-8') as f:
     existing_translations_en = json.load(f)
 
+# 中文文字 → 現有 key 的反向索引
+TEXT_KEY_INDEX = TextKeyIndex.from_translations(existing_translations_zh)
+
+# 新 key 的配置紀錄（確保重複執行得到相同 key）
+KEY_REGISTRY_FILE = Path('/home/ubuntu/apolnus/scripts/extracted/key_registry.json')
+KEY_ALLOCATOR = KeyAllocator(KEY_REGISTRY_FILE).load()
+KEY_ALLOCATOR.seed(existing_translations_zh)
+
 # 頁面配置
 PAGE_CONFIG = {
     'WhereToBuy': 'whereToBuy',
@@ -57,43 +78,32 @@ PAGE_CONFIG = {
 }
 
 # 排除名單（資料區塊保護）
-EXCLUDE_PATTERNS = [
-    r'const\s+stores\s*=',
-    r'const\s+dealers\s*=',
-    r'const\s+onlinePlatforms\s*=',
-    r'const\s+platforms\s*=',
-    r'const\s+serviceCenters\s*=',
-    r'address\s*:',
-    r'phone\s*:',
-    r'email\s*:',
-    r'url\s*:',
-    r'href\s*=',
-    r'src\s*=',
-]
+# 這些 const 宣告的整個 [...] / {...} 不翻譯（另外所有 const x = [...] 陣列常值也一律視為資料）
+EXCLUDE_DECLARATIONS = ['stores', 'dealers', 'onlinePlatforms', 'platforms', 'serviceCenters']
+# 物件屬性的值不翻譯
+EXCLUDE_PROPS = ['address', 'phone', 'email', 'url']
+# JSX 屬性的值不翻譯
+EXCLUDE_ATTRS = ['href', 'src']
 
 # 需要替換的屬性
 TRANSLATABLE_ATTRS = ['placeholder', 'alt', 'title', 'aria-label']
 
-def is_in_exclude_block(line: str, context_lines: List[str], line_idx: int) -> bool:
-    """判斷當前行是否在排除區塊內"""
-    # 檢查當前行
-    for pattern in EXCLUDE_PATTERNS:
-        if re.search(pattern, line):
-            return True
-    
-    # 檢查上下文（前後 5 行）
-    start = max(0, line_idx - 5)
-    end = min(len(context_lines), line_idx + 5)
-    context = '\n'.join(context_lines[start:end])
-    
-    # 檢查是否在資料陣列內
-    if re.search(r'const\s+\w+\s*=\s*\[', context):
-        # 檢查是否在陣列結束之前
-        bracket_count = context[:context.find(line) if line in context else 0].count('[') - context[:context.find(line) if line in context else 0].count(']')
-        if bracket_count > 0:
-            return True
-    
-    return False
+# 匹配 <tag>text</tag> 格式（不跨行）
+TAG_TEXT_RE = re.compile(r'(<[a-zA-Z][^>\n]*>)([^<{\n]+)(</[a-zA-Z][^>\n]*>)')
+# 匹配 attr="text" 格式（不跨行）
+ATTR_TEXT_RE = re.compile(
+    r'(' + '|'.join(re.escape(attr) for attr in TRANSLATABLE_ATTRS) + r')[ \t]*=[ \t]*["\']([^"\'\n]+)["\']'
+)
+
+def page_namespace(page_name: str) -> str:
+    """
+    頁面的翻譯 namespace：pages/ 下的頁面沿用 PAGE_CONFIG（或小寫檔名），
+    子目錄中的頁面加上目錄名稱，例如 pages/admin/AdminDealers → admin_admindealers
+    """
+    parts = page_path_parts(page_name)
+    if len(parts) == 1:
+        return PAGE_CONFIG.get(parts[0], parts[0].lower())
+    return '_'.join(part.lower() for part in parts)
 
 def contains_chinese(text: str) -> bool:
     """檢查文字是否包含中文"""
@@ -137,20 +147,8 @@ def should_translate(text: str, context: str = '') -> bool:
 
 def generate_key_from_text(text: str, page_key: str) -> str:
     """從文字生成翻譯 key"""
-    # 查找現有翻譯中是否已經有這個文字
-    def find_existing_key(translations: dict, target_text: str, prefix: str = '') -> str:
-        for key, value in translations.items():
-            full_key = f'{prefix}.{key}' if prefix else key
-            if isinstance(value, dict):
-                result = find_existing_key(value, target_text, full_key)
-                if result:
-                    return result
-            elif isinstance(value, str) and value.strip() == target_text.strip():
-                return full_key
-        return ''
-    
-    # 先嘗試在現有翻譯中查找
-    existing_key = find_existing_key(existing_translations_zh, text, page_key)
+    # 先嘗試在現有翻譯中查找（反向索引，O(1)）
+    existing_key = TEXT_KEY_INDEX.lookup(text)
     if existing_key:
         return existing_key
     
@@ -161,95 +159,112 @@ def generate_key_from_text(text: str, page_key: str) -> str:
     simplified = re.sub(r'[^\w\s]', '', simplified)
     # 轉換為拼音或使用簡化邏輯
     words = simplified.split()
+    base = None
     if words:
         # 使用前幾個字作為 key
-        key = '_'.join(words[:3]).lower()
+        base = '_'.join(words[:3]).lower()
         # 移除非 ASCII 字符
-        key = re.sub(r'[^\x00-\x7F]+', '', key)
-        if not key:
-            # 如果沒有英文，使用 hash
-            key = f'text_{hash(text) % 10000}'
-    else:
-        key = f'text_{hash(text) % 10000}'
+        base = re.sub(r'[^\x00-\x7F]+', '', base)
+    # 沒有英文時使用 t_ + hash；撞到其他文字的 key 時由配置器延長
+    key = KEY_ALLOCATOR.allocate(page_key, text, base or None)
     
-    return f'{page_key}.{key}'
+    # 新 key 立即加入索引，之後遇到相同文字直接沿用
+    full_key = f'{page_key}.{key}'
+    TEXT_KEY_INDEX.add(full_key, text)
+    return full_key
+
+def build_page_exclusions(content: str) -> ExclusionIndex:
+    """建立頁面的資料區塊保護範圍索引"""
+    return build_exclusion_index(content, EXCLUDE_DECLARATIONS, EXCLUDE_PROPS, EXCLUDE_ATTRS)
+
+def line_at(content: str, start: int, end: int) -> str:
+    """回傳包含 [start, end) 的整行內容"""
+    line_start = content.rfind('\n', 0, start) + 1
+    line_end = content.find('\n', end)
+    return content[line_start:] if line_end == -1 else content[line_start:line_end]
 
-def replace_jsx_text(content: str, page_key: str) -> Tuple[str, Dict[str, str]]:
-    """替換 JSX 文字"""
-    lines = content.split('\n')
-    new_lines = []
+def replace_jsx_text(content: str, page_key: str,
+                     resolve_key: Callable[[str, str], str] = generate_key_from_text) -> Tuple[str, Dict[str, str]]:
+    """
+    替換 JSX 文字，resolve_key(文字, 頁面 key) 決定每段文字的 key
+    落在資料區塊保護範圍內的文字不替換；每個階段替換後位置會變動，因此各自重建索引
+    """
     new_translations = {}
     
-    in_exclude_block = False
-    bracket_depth = 0
+    # 替換 JSX 標籤內的純文字
+    # 例如：<h1>購買通路</h1> -> <h1>{t('whereToBuy.title')}</h1>
+    exclusions = build_page_exclusions(content)
     
-    for i, line in enumerate(lines):
-        # 檢查是否在排除區塊
-        if is_in_exclude_block(line, lines, i):
-            new_lines.append(line)
-            in_exclude_block = True
-            continue
-        
-        # 追蹤大括號深度
-        bracket_depth += line.count('{') - line.count('}')
-        
-        # 如果在資料區塊內，跳過
-        if in_exclude_block and bracket_depth > 0:
-            new_lines.append(line)
-            continue
-        else:
-            in_exclude_block = False
+    def replace_tag_text(match):
+        opening_tag = match.group(1)
+        text = match.group(2)
+        closing_tag = match.group(3)
         
-        # 替換 JSX 標籤內的純文字
-        # 例如：<h1>購買通路</h1> -> <h1>{t('whereToBuy.title')}</h1>
-        def replace_tag_text(match):
-            opening_tag = match.group(1)
-            text = match.group(2)
-            closing_tag = match.group(3)
-            
-            if should_translate(text, line):
-                key = generate_key_from_text(text, page_key)
-                new_translations[key] = text
-                return f'{opening_tag}{{t(\'{key}\')}}{closing_tag}'
+        if exclusions.overlaps(match.start(2), match.end(2)):
             return match.group(0)
+        if should_translate(text, line_at(match.string, match.start(), match.end())):
+            key = resolve_key(text, page_key)
+            new_translations[key] = text
+            return f'{opening_tag}{{t(\'{key}\')}}{closing_tag}'
+        return match.group(0)
+    
+    content = TAG_TEXT_RE.sub(replace_tag_text, content)
+    
+    # 替換屬性內的文字
+    # 例如：placeholder="搜尋..." -> placeholder={t('whereToBuy.searchPlaceholder')}
+    exclusions = build_page_exclusions(content)
+    
+    def replace_attr_text(match):
+        attr_name = match.group(1)
+        text = match.group(2)
         
-        # 匹配 <tag>text</tag> 格式
-        line = re.sub(
-            r'(<[a-zA-Z][^>]*>)([^<{]+)(</[a-zA-Z][^>]*>)',
-            replace_tag_text,
-            line
-        )
-        
-        # 替換屬性內的文字
-        # 例如：placeholder="搜尋..." -> placeholder={t('whereToBuy.searchPlaceholder')}
-        for attr in TRANSLATABLE_ATTRS:
-            def replace_attr_text(match):
-                attr_name = match.group(1)
-                text = match.group(2)
-                
-                if should_translate(text, line):
-                    key = generate_key_from_text(text, page_key)
-                    new_translations[key] = text
-                    return f'{attr_name}={{t(\'{key}\')}}'
-                return match.group(0)
-            
-            line = re.sub(
-                rf'({attr})\s*=\s*["\']([^"\']+)["\']',
-                replace_attr_text,
-                line
-            )
-        
-        new_lines.append(line)
+        if exclusions.overlaps(match.start(), match.end()):
+            return match.group(0)
+        if should_translate(text, line_at(match.string, match.start(), match.end())):
+            key = resolve_key(text, page_key)
+            new_translations[key] = text
+            return f'{attr_name}={{t(\'{key}\')}}'
+        return match.group(0)
+    
+    content = ATTR_TEXT_RE.sub(replace_attr_text, content)
+    
+    return content, new_translations
+
+def collect_page_texts(page_name: str, page_file: Path = None) -> Optional[List[str]]:
+    """第一階段：找出頁面中需要翻譯的文字（依出現順序、不重複），不修改檔案；頁面不存在時回傳 None"""
+    page_file = page_file or PAGES_DIR / f'{page_name}.tsx'
+    if not page_file.exists():
+        print(f'⚠️  頁面不存在: {page_name}')
+        return None
+    
+    with open(page_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    texts: Dict[str, None] = {}
+    
+    def collect(text: str, page_key: str) -> str:
+        texts.setdefault(text)
+        # 只是佔位，key 由主程序配置（key 只含英數字、底線與 "."，不影響屬性階段的比對）
+        return f'{page_key}.pending'
     
-    return '\n'.join(new_lines), new_translations
+    replace_jsx_text(content, page_namespace(page_name), collect)
+    return list(texts)
 
-def process_page(page_name: str) -> bool:
-    """處理單個頁面"""
-    page_file = PAGES_DIR / f'{page_name}.tsx'
+def allocate_page_keys(page_name: str, texts: List[str]) -> Dict[str, str]:
+    """在主程序中依序為頁面的文字配置 key，回傳 {文字: 完整 key}"""
+    page_key = page_namespace(page_name)
+    return {text: generate_key_from_text(text, page_key) for text in texts}
+
+def process_page(page_name: str, page_file: Path = None, keys: Dict[str, str] = None) -> Optional[Dict[str, str]]:
+    """
+    處理單個頁面，回傳新翻譯 {key: 文字}；頁面不存在時回傳 None
+    keys 為主程序配置好的 {文字: 完整 key}；不指定時在本 process 中配置
+    """
+    page_file = page_file or PAGES_DIR / f'{page_name}.tsx'
     
     if not page_file.exists():
         print(f'⚠️  頁面不存在: {page_name}')
-        return False
+        return None
     
     print(f'\n📄 處理頁面: {page_name}')
     
@@ -257,18 +272,20 @@ def process_page(page_name: str) -> bool:
     with open(page_file, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # 獲取頁面 key
-    page_key = PAGE_CONFIG.get(page_name, page_name.lower())
+    # 獲取頁面 key（--all 模式下 page_name 為 pages/admin/AdminJobs 這類相對路徑）
+    page_key = page_namespace(page_name)
     
     # 替換文字
-    new_content, new_translations = replace_jsx_text(content, page_key)
+    if keys is None:
+        new_content, new_translations = replace_jsx_text(content, page_key)
+    else:
+        new_content, new_translations = replace_jsx_text(content, page_key, lambda text, _: keys[text])
     
     if new_translations:
         print(f'   ✅ 找到 {len(new_translations)} 個需要翻譯的文字')
         
         # 保存修改後的檔案
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        write_text_if_changed(page_file, new_content)
         print(f'   ✅ 文字替換完成')
         
         # 更新翻譯檔案
@@ -277,32 +294,80 @@ def process_page(page_name: str) -> bool:
     else:
         print(f'   ℹ️  沒有找到需要替換的文字')
     
-    return True
+    return new_translations
+
+def _collect_job(job) -> Optional[List[str]]:
+    """process pool 的工作單元（第一階段）：(page_name, page_file)"""
+    return collect_page_texts(*job)
+
+def _process_job(job) -> Optional[Dict[str, str]]:
+    """process pool 的工作單元（第二階段）：(page_name, page_file, {文字: key})"""
+    return process_page(*job)
 
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='文字替換批次處理')
+    add_parallel_arguments(parser)
+    args = parser.parse_args()
+    
     print('🚀 開始文字替換批次處理...\n')
     print('=' * 60)
     
     success_count = 0
     failed_count = 0
     
-    for page_name in TARGET_PAGES[:3]:  # 先處理前 3 個頁面作為測試
-        try:
-            if process_page(page_name):
+    if args.all:
+        targets = [(source_id(path, SRC_DIR), path) for path in discover_sources(SRC_DIR)]
+    else:
+        targets = [(page_name, None) for page_name in TARGET_PAGES[:3]]  # 先處理前 3 個頁面作為測試
+    
+    collisions = find_namespace_collisions((page_name for page_name, _ in targets), page_namespace)
+    if collisions:
+        for namespace, pages in collisions.items():
+            print(f'❌ namespace {namespace} 同時對應到: {", ".join(pages)}')
+        sys.exit(1)
+    
+    try:
+        # 第一階段：找出各頁面的文字，依頁面順序在主程序配置 key
+        jobs = []
+        for outcome in run_parallel(_collect_job, targets, args.workers):
+            page_name, page_file = outcome.item
+            print(outcome.output, end='')
+            if outcome.error:
+                print(f'❌ 掃描 {page_name} 時發生錯誤:')
+                print(outcome.error)
+                failed_count += 1
+            elif outcome.result is not None:
+                try:
+                    jobs.append((page_name, page_file, allocate_page_keys(page_name, outcome.result)))
+                except KeyCollisionError as e:
+                    # 頁面不替換，其他頁面照常處理
+                    print(f'❌ {page_name} 的 key 配置失敗: {e}')
+                    failed_count += 1
+            else:
+                failed_count += 1
+        
+        # 第二階段：依配置好的 key 替換並寫回
+        for outcome in run_parallel(_process_job, jobs, args.workers):
+            page_name = outcome.item[0]
+            print(outcome.output, end='')
+            if outcome.error:
+                print(f'❌ 處理 {page_name} 時發生錯誤:')
+                print(outcome.error)
+                failed_count += 1
+            elif outcome.result is not None:
                 success_count += 1
             else:
                 failed_count += 1
-        except Exception as e:
-            print(f'❌ 處理 {page_name} 時發生錯誤: {str(e)}')
-            import traceback
-            traceback.print_exc()
-            failed_count += 1
+    finally:
+        # 中途失敗也保存已配置的 key，已寫回的頁面下次執行才會得到相同的 key
+        KEY_ALLOCATOR.save()
     
     print('\n' + '=' * 60)
     print(f'\n✅ 文字替換完成！')
     print(f'📊 成功: {success_count} 個頁面')
     print(f'📊 失敗: {failed_count} 個頁面')
+    print(STATS.summary())
 
 if __name__ == '__main__':
     main()
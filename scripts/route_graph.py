@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+前端路由 → 翻譯 namespace 對應
+解析 App.tsx 的 import 與 <Route path component>，沿著 import 圖（"./"、"../"、"@/" 開頭的本地模組）走訪每個路由會載入的檔案，
+收集其中 t('namespace.key') / i18nKey="namespace.key" 用到的 namespace
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+_IMPORT_RE = re.compile(
+    r'''(?:import|export)\s+(?:type\s+)?(?:([\w$]+)|\*\s+as\s+[\w$]+|\{[^}]*\}|[\w$]+\s*,\s*\{[^}]*\})?\s*(?:from\s+)?['"]([^'"]+)['"]'''
+    r'''|import\(\s*['"]([^'"]+)['"]\s*\)'''
+)
+_ROUTE_RE = re.compile(r'<Route\b([^>]*?)\bcomponent=\{\s*([\w$]+)\s*\}')
+_PATH_ATTR_RE = re.compile(r'\bpath=["\']([^"\']+)["\']')
+# 沒有 path 的 <Route component={NotFound} /> 為 fallback
+FALLBACK_ROUTE = '*'
+# t('home.title')、t("home:title")、t(`home.${id}`)、i18nKey="home.title"
+_NAMESPACE_RE = re.compile(r'''(?:\bt\(\s*|\bi18nKey=\{?\s*)['"`]([\w-]+)[.:]''')
+
+RESOLVE_SUFFIXES = ('.tsx', '.ts', '.jsx', '.js')
+
+
+class Route(NamedTuple):
+    path: str
+    component: str
+    source: Path
+
+
+def used_namespaces(content: str) -> Set[str]:
+    return set(_NAMESPACE_RE.findall(content))
+
+
+class SourceGraph:
+    """src_dir 下本地模組的 import 圖；檔案內容與解析結果都會快取"""
+
+    def __init__(self, src_dir):
+        self.src_dir = Path(src_dir)
+        self._imports: Dict[Path, List[Path]] = {}
+        self._namespaces: Dict[Path, Set[str]] = {}
+        self._default_imports: Dict[Path, Dict[str, Path]] = {}
+
+    def resolve(self, spec: str, importer: Path):
+        """把 import 字串解析成檔案路徑，非本地模組回傳 None"""
+        if spec.startswith('@/'):
+            base = self.src_dir / spec[2:]
+        elif spec.startswith('.'):
+            base = importer.parent / spec
+        else:
+            return None
+        candidates = [base] if base.suffix in RESOLVE_SUFFIXES else []
+        candidates += [base.with_name(base.name + suffix) for suffix in RESOLVE_SUFFIXES]
+        candidates += [base / f'index{suffix}' for suffix in RESOLVE_SUFFIXES]
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate.resolve()
+        return None
+
+    def _parse(self, path: Path):
+        if path in self._imports:
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        imports, defaults = [], {}
+        for m in _IMPORT_RE.finditer(content):
+            spec = m.group(2) or m.group(3)
+            target = self.resolve(spec, path)
+            if target is None:
+                continue
+            imports.append(target)
+            if m.group(1):
+                defaults[m.group(1)] = target
+        self._imports[path] = imports
+        self._default_imports[path] = defaults
+        self._namespaces[path] = used_namespaces(content)
+
+    def closure(self, roots: Iterable[Path], exclude: Set[Path] = frozenset()) -> Set[Path]:
+        """roots 會載入的所有本地檔案（不往 exclude 中的檔案走）"""
+        seen: Set[Path] = set()
+        stack = [Path(root).resolve() for root in roots]
+        while stack:
+            path = stack.pop()
+            if path in seen or path in exclude:
+                continue
+            seen.add(path)
+            self._parse(path)
+            stack.extend(self._imports[path])
+        return seen
+
+    def namespaces(self, files: Iterable[Path]) -> Set[str]:
+        result: Set[str] = set()
+        for path in files:
+            self._parse(path)
+            result |= self._namespaces[path]
+        return result
+
+    def routes(self, app_file) -> List[Route]:
+        """App.tsx 中的 <Route path component>，依出現順序；沒有 path 的 fallback 路由以 FALLBACK_ROUTE 表示"""
+        app_file = Path(app_file).resolve()
+        self._parse(app_file)
+        with open(app_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        defaults = self._default_imports[app_file]
+        routes = []
+        for attrs, component in _ROUTE_RE.findall(content):
+            if component not in defaults:
+                continue
+            path = _PATH_ATTR_RE.search(attrs)
+            routes.append(Route(path.group(1) if path else FALLBACK_ROUTE, component, defaults[component]))
+        return routes
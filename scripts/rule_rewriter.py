@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+單次掃描的多規則替換引擎
+把 (pattern, replacement) 規則表編譯成一個合併的 regex，整個檔案只走訪一次，並統計每條規則的命中次數
+純文字規則（literal）以跳脫後、由長到短排序的 alternation 比對，避免短字串搶先吃掉長字串
+
+合併時各規則的群組編號會位移，pattern 中的反向參照（\\1、(?P=name)）與具名群組因此改寫成各規則專屬的名稱；
+無法安全改寫的 pattern（條件式 (?(1)…)、verbose 模式）不併入，在合併替換之後另外逐條 sub
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from atomic_output import write_text_if_changed
+
+
+def _isolate_groups(pattern: str, prefix: str) -> Optional[str]:
+    """
+    把 pattern 中的反向參照改成以 prefix 開頭的具名參照，讓 pattern 能併入其他規則之後
+    \\N → (?P=<prefix>gN)，並把第 N 個捕獲群組命名為 <prefix>gN；(?P<name>…)、(?P=name) → <prefix>name
+    沒有反向參照與具名群組時原樣回傳；遇到無法安全改寫的語法回傳 None
+    """
+    if '(?(' in pattern or '(?x' in pattern:
+        return None
+    if '\\' not in pattern and '(?P' not in pattern:
+        return pattern
+
+    # 第一次走訪：找出捕獲群組（依編號）與反向參照的位置
+    groups = []  # [(位置, 名稱或 None)]
+    refs = []  # [(開始, 結束, 參照的群組編號或名稱)]
+    i, n, in_class = 0, len(pattern), False
+    while i < n:
+        ch = pattern[i]
+        if ch == '\\':
+            m = re.match(r'[1-9][0-9]?', pattern[i + 1:i + 3]) if not in_class else None
+            if m and not re.match(r'[0-7]{3}', pattern[i + 1:i + 4]):
+                refs.append((i, i + 1 + m.end(), int(m.group())))
+                i += 1 + m.end()
+            else:
+                i += 2
+        elif in_class:
+            if ch == ']':
+                in_class = False
+            i += 1
+        elif ch == '[':
+            in_class = True
+            # 緊接在 [ 或 [^ 之後的 ] 是字元本身
+            i += 2 if pattern.startswith('[^', i) else 1
+            if i < n and pattern[i] == ']':
+                i += 1
+        elif ch == '(':
+            if pattern.startswith('(?P<', i):
+                end = pattern.index('>', i)
+                groups.append((i, pattern[i + 4:end]))
+                i = end + 1
+            elif pattern.startswith('(?P=', i):
+                end = pattern.index(')', i)
+                refs.append((i, end + 1, pattern[i + 4:end]))
+                i = end + 1
+            elif pattern.startswith('(?', i):
+                i += 2
+            else:
+                groups.append((i, None))
+                i += 1
+        else:
+            i += 1
+
+    def group_name(index: int) -> str:
+        name = groups[index - 1][1]
+        return prefix + (name if name is not None else f'g{index}')
+
+    # 第二次：由後往前替換，位置才不會位移
+    edits = []
+    for start, end, target in refs:
+        if isinstance(target, int):
+            if target > len(groups):
+                return None
+            edits.append((start, end, f'(?P={group_name(target)})'))
+        else:
+            edits.append((start, end, f'(?P={prefix}{target})'))
+    referenced = {target for _, _, target in refs if isinstance(target, int)}
+    for index, (start, name) in enumerate(groups, 1):
+        if name is not None:
+            edits.append((start, start + 4 + len(name) + 1, f'(?P<{prefix}{name}>'))
+        elif index in referenced:
+            edits.append((start, start + 1, f'(?P<{group_name(index)}>'))
+    rewritten = pattern
+    for start, end, text in sorted(edits, reverse=True):
+        rewritten = rewritten[:start] + text + rewritten[end:]
+    return rewritten
+
+
+class RuleSet:
+    r"""
+    編譯好的規則表
+    同一位置有多條規則可匹配時，以規則表中排在前面者為準（literal 模式則以最長者為準）
+    與逐條 re.sub 的差別：替換後的結果不會再被後面的規則比對
+
+    pattern 中的反向參照與具名群組在合併後仍然有效：
+    >>> rules = RuleSet([(r'(a)(b)', r'\2\1'), (r'(["\'])x\1', 'Q'), (r'(?P<d>\d)(?P=d)', r'<\g<d>>')])
+    >>> rules.apply('ab "x" \'x\' "x\' 11')
+    ('ba Q Q "x\' <1>', [1, 2, 1])
+    >>> RuleSet([(r'(?P<w>\w)-', r'\g<w>'), (r'(?P<w>\d)!', r'\g<w>')]).apply('a- 1!')
+    ('a 1', [1, 1])
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str]], literal: bool = False, flags: int = 0):
+        self.rules = list(rules)
+        self.literal = literal
+        self.hits = [0] * len(self.rules)
+        # 無法併入合併 regex 的規則，合併替換之後逐條 sub
+        self._separate: List[int] = []
+
+        if literal:
+            # 相同字串只保留第一條規則
+            self._literal_index: Dict[str, int] = {}
+            for i, (text, _) in enumerate(self.rules):
+                self._literal_index.setdefault(text, i)
+            ordered = sorted(self._literal_index, key=len, reverse=True)
+            self.pattern = re.compile('|'.join(re.escape(text) for text in ordered), flags)
+            return
+
+        # 每條規則包成一個外層群組，lastindex 即可對應回規則
+        self._compiled = [re.compile(pattern, flags) for pattern, _ in self.rules]
+        self._group_rule: Dict[int, int] = {}
+        parts = []
+        group = 1
+        for i, compiled in enumerate(self._compiled):
+            isolated = None if compiled.flags & re.VERBOSE else _isolate_groups(compiled.pattern, f'_r{i}_')
+            try:
+                isolated_groups = re.compile(isolated, flags).groups if isolated is not None else None
+            except re.error:
+                isolated_groups = None
+            if isolated_groups != compiled.groups:
+                self._separate.append(i)
+                continue
+            self._group_rule[group] = i
+            parts.append('(' + isolated + ')')
+            group += compiled.groups + 1
+        self.pattern = re.compile('|'.join(parts), flags) if parts else None
+
+    def _replace(self, m: re.Match) -> str:
+        if self.literal:
+            i = self._literal_index[m.group()]
+            self.hits[i] += 1
+            return self.rules[i][1]
+
+        i = self._group_rule[m.lastindex]
+        self.hits[i] += 1
+        # 以原規則在同一位置重新比對，replacement 中的 \1、\g<name> 才會對應到規則自己的群組
+        return self._compiled[i].match(m.string, m.start()).expand(self.rules[i][1])
+
+    def apply(self, content: str) -> Tuple[str, List[int]]:
+        """單次替換，回傳 (新內容, 本次各規則命中次數)"""
+        before = list(self.hits)
+        if not self.rules:
+            return content, before
+        new_content = self.pattern.sub(self._replace, content) if self.pattern is not None else content
+        for i in self._separate:
+            new_content, count = self._compiled[i].subn(self.rules[i][1], new_content)
+            self.hits[i] += count
+        return new_content, [after - prev for after, prev in zip(self.hits, before)]
+
+    def rewrite_file(self, path) -> List[int]:
+        """替換檔案內容，有變更才寫回，回傳各規則命中次數"""
+        path = Path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        new_content, hits = self.apply(content)
+        write_text_if_changed(path, new_content)
+        return hits
+
+    def report(self, hits: List[int] = None) -> List[str]:
+        """每條規則一行的命中統計"""
+        hits = self.hits if hits is None else hits
+        width = len(str(max(hits, default=0)))
+        return [f'{count:>{width}} × {rule[0]}' for rule, count in zip(self.rules, hits)]
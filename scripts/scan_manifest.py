@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+scan_pages 增量快取
+以「檔案路徑 + 內容 hash」記錄每個頁面的掃描結果，mtime/size 相同時直接沿用，不必重新讀檔
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from atomic_output import write_json_if_changed
+
+# 掃描邏輯（提取規則 / 結果格式）變更時調升，舊快取會整份失效
+SCAN_VERSION = 3
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ScanManifest:
+    """持久化的掃描清單：{路徑: {mtime_ns, size, sha256, result}}"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._seen = set()
+
+    def load(self) -> 'ScanManifest':
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                print(f'⚠️  掃描快取損毀，將重新掃描: {self.path}')
+                data = {}
+            if data.get('version') == SCAN_VERSION:
+                self.entries = data.get('entries', {})
+        return self
+
+    def save(self):
+        """寫回快取，順便移除這次沒有掃描到的頁面"""
+        stale = set(self.entries) - self._seen
+        for key in stale:
+            del self.entries[key]
+            self.dirty = True
+        if not self.dirty and self.path.exists():
+            return
+        write_json_if_changed(self.path, {'version': SCAN_VERSION, 'entries': self.entries}, indent=None)
+
+    def lookup(self, file_path: Path) -> Tuple[Optional[dict], Optional[tuple]]:
+        """
+        查詢快取，回傳 (result, pending)
+        命中時 pending 為 None；未命中時 result 為 None，pending 交給 store() 寫入新結果
+        mtime 與 size 未變 → 直接沿用；否則比對內容 hash，真的變了才算未命中
+        """
+        key = str(file_path)
+        self._seen.add(key)
+        stat = os.stat(file_path)
+        entry = self.entries.get(key)
+
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.hits += 1
+            return entry['result'], None
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        digest = content_hash(data)
+
+        if entry and entry['sha256'] == digest:
+            # 內容相同只是 mtime 變了（例如 git checkout），更新時間戳即可
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            self.dirty = True
+            self.hits += 1
+            return entry['result'], None
+
+        self.misses += 1
+        return None, (key, stat.st_mtime_ns, stat.st_size, digest, data.decode('utf-8'))
+
+    @staticmethod
+    def pending_content(pending: tuple) -> str:
+        return pending[4]
+
+    def store(self, pending: tuple, result: Optional[dict]):
+        key, mtime_ns, size, digest, _ = pending
+        self.entries[key] = {
+            'mtime_ns': mtime_ns,
+            'size': size,
+            'sha256': digest,
+            'result': result,
+        }
+        self.dirty = True
+
+    def get_or_scan(self, file_path: Path, scan: Callable[[str], Optional[dict]]) -> Tuple[Optional[dict], bool]:
+        """取得頁面掃描結果，回傳 (result, 是否重新掃描)"""
+        result, pending = self.lookup(file_path)
+        if pending is None:
+            return result, False
+        result = scan(self.pending_content(pending))
+        self.store(pending, result)
+        return result, True
@@ -6,9 +6,14 @@
 
 import os
 import re
-import json
+import argparse
 from pathlib import Path
 
+from atomic_output import write_json_if_changed
+from page_discovery import add_parallel_arguments, discover_sources, run_parallel, source_id
+from scan_manifest import ScanManifest
+from scan_stream import ScanResultWriter
+
 # 目標頁面列表
 TARGET_PAGES = [
     'WhereToBuy',
@@ -29,59 +34,64 @@ TARGET_PAGES = [
 
 # 頁面路徑
 PAGES_DIR = Path('/home/ubuntu/apolnus/client/src/pages')
+SRC_DIR = PAGES_DIR.parent
 OUTPUT_DIR = Path('/home/ubuntu/apolnus/scripts/extracted')
+MANIFEST_FILE = OUTPUT_DIR / 'scan_manifest.json'
+
+# 中文字符、標點符號和常見符號
+CHINESE_RE = re.compile(r'[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]+')
+
+# {t('...')} 中的 key、JSX 標籤中的純文字、字串常值
+T_KEY_RE = re.compile(r"\{t\(['\"]([^'\"]+)['\"]\)\}")
+TAG_TEXT_RE = re.compile(r'<[^>]+>([^<{]+)</[^>]+>')
+STRING_RE = re.compile(r'["\']([^"\']{3,})["\']')
+
+# section 標籤
+SECTION_RE = re.compile(r'<section[^>]*>(.*?)</section>', re.DOTALL)
+
+# 字串常值中出現這些片段時視為路徑、類名等，不列入文字元素
+STRING_EXCLUDES = ['/', 'className', 'http', 'www', '.', 'px-', 'py-', 'bg-', 'text-']
 
 def extract_chinese_text(content):
     """提取中文文字（包含標點符號）"""
-    # 匹配中文字符、標點符號和常見符號
-    pattern = r'[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]+'
-    matches = re.findall(pattern, content)
-    return matches
+    return CHINESE_RE.findall(content)
 
 def extract_jsx_text(content):
     """提取 JSX 中的文字內容"""
     texts = []
     
     # 提取 {t('...')} 中的 key
-    t_pattern = r"\{t\(['\"]([^'\"]+)['\"]\)\}"
-    t_matches = re.findall(t_pattern, content)
-    texts.extend([('t_key', key) for key in t_matches])
+    texts.extend([('t_key', key) for key in T_KEY_RE.findall(content)])
     
     # 提取 JSX 標籤中的純文字
     # 例如：<h1>文字</h1> 或 <p>文字</p>
-    tag_text_pattern = r'<[^>]+>([^<{]+)</[^>]+>'
-    tag_matches = re.findall(tag_text_pattern, content)
-    for match in tag_matches:
+    for match in TAG_TEXT_RE.findall(content):
         text = match.strip()
         if text and len(text) > 1:  # 過濾掉單字符
             texts.append(('jsx_text', text))
     
     # 提取字符串字面量中的文字
-    string_pattern = r'["\']([^"\']{3,})["\']'
-    string_matches = re.findall(string_pattern, content)
-    for match in string_matches:
+    for match in STRING_RE.findall(content):
         # 過濾掉路徑、類名等
-        if not any(x in match for x in ['/', 'className', 'http', 'www', '.', 'px-', 'py-', 'bg-', 'text-']):
-            chinese = extract_chinese_text(match)
-            if chinese:
-                texts.append(('string', match))
+        if not any(x in match for x in STRING_EXCLUDES) and CHINESE_RE.search(match):
+            texts.append(('string', match))
     
     return texts
 
 def analyze_page_structure(page_name, content):
     """分析頁面結構，識別核心關鍵字"""
+    lowered = content.lower()
     structure = {
         'page_name': page_name,
         'sections': [],
         'keywords': [],
-        'has_form': 'form' in content.lower() or 'input' in content.lower(),
-        'has_table': 'table' in content.lower() or 'thead' in content.lower(),
-        'has_map': 'map' in content.lower() or 'google' in content.lower(),
+        'has_form': 'form' in lowered or 'input' in lowered,
+        'has_table': 'table' in lowered or 'thead' in lowered,
+        'has_map': 'map' in lowered or 'google' in lowered,
     }
     
     # 識別 section 標籤
-    section_pattern = r'<section[^>]*>(.*?)</section>'
-    sections = re.findall(section_pattern, content, re.DOTALL)
+    sections = SECTION_RE.findall(content)
     structure['sections'] = [f'section_{i+1}' for i in range(len(sections))]
     
     # 根據頁面名稱識別核心關鍵字
@@ -101,23 +111,12 @@ def analyze_page_structure(page_name, content):
         'NotFound': ['404', '找不到', 'not found', 'error'],
     }
     
-    structure['keywords'] = keyword_map.get(page_name, [])
+    structure['keywords'] = keyword_map.get(page_name.rsplit('/', 1)[-1], [])
     
     return structure
 
-def scan_page(page_name):
-    """掃描單個頁面"""
-    page_file = PAGES_DIR / f'{page_name}.tsx'
-    
-    if not page_file.exists():
-        print(f'⚠️  頁面不存在: {page_name}')
-        return None
-    
-    print(f'📄 掃描頁面: {page_name}')
-    
-    with open(page_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
+def analyze_content(page_name, page_file, content):
+    """分析單個頁面內容"""
     # 分析頁面結構
     structure = analyze_page_structure(page_name, content)
     
@@ -133,40 +132,148 @@ def scan_page(page_name):
         'structure': structure,
         'texts': texts,
         'chinese_texts': list(set(chinese_texts)),  # 去重
-        'line_count': len(content.split('\n')),
+        'line_count': content.count('\n') + 1,
     }
     
     return result
 
+def scan_page(page_name, manifest=None):
+    """掃描單個頁面（有 manifest 時，內容未變的頁面直接沿用上次結果）"""
+    page_file = PAGES_DIR / f'{page_name}.tsx'
+    
+    if not page_file.exists():
+        print(f'⚠️  頁面不存在: {page_name}')
+        return None
+    
+    if manifest is None:
+        print(f'📄 掃描頁面: {page_name}')
+        with open(page_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return analyze_content(page_name, page_file, content)
+    
+    result, rescanned = manifest.get_or_scan(
+        page_file, lambda content: analyze_content(page_name, page_file, content)
+    )
+    print(f'📄 {"掃描頁面" if rescanned else "沿用快取"}: {page_name}')
+    return result
+
+def _analyze_job(job):
+    """
+    process pool 的工作單元：(page_name, page_file, content)
+    content 為 None 時（不使用快取）由子 process 自己讀檔，主程序不必先把所有檔案讀進記憶體
+    """
+    page_name, page_file, content = job
+    if content is None:
+        with open(page_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+    return analyze_content(page_name, page_file, content)
+
+def collect_targets(scan_all):
+    """回傳 [(page_name, page_file)]：固定頁面清單，或整個 client/src"""
+    if scan_all:
+        return [(source_id(path, SRC_DIR), path) for path in discover_sources(SRC_DIR)]
+    
+    targets = []
+    for page_name in TARGET_PAGES:
+        page_file = PAGES_DIR / f'{page_name}.tsx'
+        if not page_file.exists():
+            print(f'⚠️  頁面不存在: {page_name}')
+            continue
+        targets.append((page_name, page_file))
+    return targets
+
+def print_page_summary(page_name, result, rescanned):
+    print(f'📄 {"掃描頁面" if rescanned else "沿用快取"}: {page_name}')
+    print(f'   ✅ 找到 {len(result["chinese_texts"])} 個中文文字片段')
+    print(f'   ✅ 找到 {len(result["texts"])} 個文字元素')
+    print(f'   ✅ 頁面結構: {len(result["structure"]["sections"])} 個 sections')
+    print()
+
+def iter_scanned(targets, manifest, workers):
+    """
+    依路徑順序逐一產出 (page_name, result, rescanned)
+    先查快取，只有內容變更的頁面才送進 process pool；命中快取的頁面不必等待前面的掃描
+    """
+    jobs = []
+    cached = {}
+    pending_by_name = {}
+    for page_name, page_file in targets:
+        if manifest is None:
+            jobs.append((page_name, page_file, None))
+            continue
+        result, pending = manifest.lookup(page_file)
+        if pending is None:
+            cached[page_name] = result
+        else:
+            pending_by_name[page_name] = pending
+            jobs.append((page_name, page_file, manifest.pending_content(pending)))
+    
+    outcomes = run_parallel(_analyze_job, jobs, workers)
+    for page_name, _ in targets:
+        if page_name in cached:
+            yield page_name, cached[page_name], False
+            continue
+        outcome = next(outcomes)
+        if outcome.error:
+            print(f'❌ 掃描 {page_name} 時發生錯誤:\n{outcome.error}')
+            continue
+        if manifest is not None:
+            manifest.store(pending_by_name[page_name], outcome.result)
+        yield page_name, outcome.result, True
+
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='掃描所有頁面提取文字內容和結構')
+    parser.add_argument('--no-cache', action='store_true', help='忽略掃描快取，全部重新掃描')
+    parser.add_argument('--format', choices=['jsonl', 'json'], default='jsonl',
+                        help='jsonl：每完成一個頁面就寫入一行（預設）；json：舊版單一 JSON 檔')
+    add_parallel_arguments(parser)
+    args = parser.parse_args()
+    
     print('🚀 開始掃描所有頁面...\n')
     
     # 創建輸出目錄
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
-    results = {}
+    output_file = OUTPUT_DIR / ('scan_results.jsonl' if args.format == 'jsonl' else 'scan_results.json')
+    manifest = None if args.no_cache else ScanManifest(MANIFEST_FILE).load()
+    targets = collect_targets(args.all)
+    scanned = iter_scanned(targets, manifest, args.workers)
     
-    for page_name in TARGET_PAGES:
-        result = scan_page(page_name)
-        if result:
+    page_count = 0
+    total_chinese = 0
+    total_texts = 0
+    
+    if args.format == 'jsonl':
+        # 結果逐筆寫出，不在記憶體中累積
+        with ScanResultWriter(output_file) as writer:
+            for page_name, result, rescanned in scanned:
+                writer.write(result)
+                print_page_summary(page_name, result, rescanned)
+                page_count += 1
+                total_chinese += len(result['chinese_texts'])
+                total_texts += len(result['texts'])
+    else:
+        results = {}
+        for page_name, result, rescanned in scanned:
             results[page_name] = result
-            print(f'   ✅ 找到 {len(result["chinese_texts"])} 個中文文字片段')
-            print(f'   ✅ 找到 {len(result["texts"])} 個文字元素')
-            print(f'   ✅ 頁面結構: {len(result["structure"]["sections"])} 個 sections')
-            print()
+            print_page_summary(page_name, result, rescanned)
+        page_count = len(results)
+        total_chinese = sum(len(r['chinese_texts']) for r in results.values())
+        total_texts = sum(len(r['texts']) for r in results.values())
+    
+    if manifest is not None:
+        manifest.save()
+        print(f'♻️  快取命中 {manifest.hits} 個頁面，重新掃描 {manifest.misses} 個頁面')
     
-    # 保存結果
-    output_file = OUTPUT_DIR / 'scan_results.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    # 單一 JSON 檔：全部命中快取且輸出已存在時不必重寫
+    if args.format == 'json' and (manifest is None or manifest.dirty or not output_file.exists()):
+        write_json_if_changed(output_file, results)
     
     print(f'\n✅ 掃描完成！結果已保存到: {output_file}')
-    print(f'📊 總共掃描了 {len(results)} 個頁面')
+    print(f'📊 總共掃描了 {page_count} 個頁面')
     
     # 統計信息
-    total_chinese = sum(len(r['chinese_texts']) for r in results.values())
-    total_texts = sum(len(r['texts']) for r in results.values())
     print(f'📝 總共提取了 {total_chinese} 個中文文字片段')
     print(f'📝 總共提取了 {total_texts} 個文字元素')
 
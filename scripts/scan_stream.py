@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+掃描結果串流（JSON Lines）
+scan_pages 每完成一個頁面就寫入一行，下游腳本以 generator 逐筆讀取，記憶體用量不隨頁面數成長
+檔案最後一行為結束標記，follow 模式的讀取端可以在掃描尚未結束時就開始處理
+"""
+
+import json
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator, Optional
+
+# 第一行為開始標記：{"__start__": true, "run_id": …, "pid": …, "started": …}
+START_MARKER = '__start__'
+# 結束標記：{"__end__": true, "count": N}
+END_MARKER = '__end__'
+# follow 模式下檔案沒有新內容超過這個秒數就放棄（寫入端可能已卡住或在別台機器上中止）
+IDLE_TIMEOUT = 120.0
+
+
+class ScanStreamError(Exception):
+    pass
+
+
+class ScanResultWriter:
+    """
+    逐筆寫入掃描結果，每筆寫完立即 flush 讓讀取端看得到
+    先寫到同目錄的暫存檔（含開始標記）再 rename 成正式檔名：讀取端不會看到被截斷到一半的舊檔，
+    也能由 run_id 分辨是哪一次掃描
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count = 0
+        self.run_id = uuid.uuid4().hex
+        self._file = None
+
+    def __enter__(self) -> 'ScanResultWriter':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f'.{self.path.name}.', suffix='.tmp')
+        # mkstemp 建立的檔案權限是 0600，改回一般檔案的預設權限
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)
+        self._file = os.fdopen(fd, 'w', encoding='utf-8')
+        header = {START_MARKER: True, 'run_id': self.run_id, 'pid': os.getpid(), 'started': time.time()}
+        self._file.write(json.dumps(header) + '\n')
+        self._file.flush()
+        os.replace(tmp, self.path)
+        return self
+
+    def write(self, result: dict):
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        # 只有正常結束才寫結束標記，中途失敗的檔案會被 follow 讀取端視為未完成
+        if exc_type is None:
+            self._file.write(json.dumps({END_MARKER: True, 'count': self.count}) + '\n')
+        self._file.close()
+        return False
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _wait_for_file(path: Path, idle_timeout: float, poll_interval: float):
+    deadline = time.monotonic() + idle_timeout
+    while not path.exists():
+        if time.monotonic() > deadline:
+            raise ScanStreamError(f'等待 {idle_timeout:.0f} 秒仍沒有掃描結果: {path}')
+        time.sleep(poll_interval)
+
+
+def iter_scan_results(path, follow: bool = False, poll_interval: float = 0.2,
+                      idle_timeout: float = IDLE_TIMEOUT, started_after: Optional[float] = None) -> Iterator[dict]:
+    """
+    逐筆讀取掃描結果
+    follow=True 時會等待寫入端，直到讀到結束標記為止（類似 tail -f）：
+    - 檔案還不存在時先等它出現
+    - 開始時間早於 started_after 的檔案視為上一次掃描的結果，等待新的掃描取代它
+    - 寫入端 process 已結束卻沒有結束標記、或超過 idle_timeout 秒沒有新內容時拋出 ScanStreamError
+    """
+    path = Path(path)
+    if follow:
+        _wait_for_file(path, idle_timeout, poll_interval)
+    header = None
+    with open(path, 'r', encoding='utf-8') as f:
+        inode = os.fstat(f.fileno()).st_ino
+        buffer = ''
+        last_data = time.monotonic()
+        # 寫入端已結束（或檔案已被取代）時的錯誤訊息；先讀完剩下的內容，仍沒有結束標記才拋出
+        writer_gone = None
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    return
+                if writer_gone:
+                    raise ScanStreamError(writer_gone)
+                writer_gone = _check_writer(path, inode, header, last_data, idle_timeout)
+                if not writer_gone:
+                    time.sleep(poll_interval)
+                continue
+            last_data = time.monotonic()
+            buffer += line
+            if not buffer.endswith('\n'):
+                # 寫入端還沒寫完這一行
+                if not follow:
+                    return
+                continue
+            record = json.loads(buffer)
+            buffer = ''
+            if record.get(START_MARKER):
+                header = record
+                if follow and started_after is not None and record['started'] < started_after:
+                    break
+                continue
+            if record.get(END_MARKER):
+                return
+            yield record
+
+    # 舊的掃描結果：等待新的掃描以 rename 取代後重新讀取
+    _wait_for_replacement(path, inode, idle_timeout, poll_interval)
+    yield from iter_scan_results(path, follow, poll_interval, idle_timeout, started_after)
+
+
+def _check_writer(path: Path, inode: int, header: Optional[dict], last_data: float, idle_timeout: float) -> Optional[str]:
+    """
+    讀到檔案結尾時檢查寫入端；寫入端已不會再寫入時回傳錯誤訊息（寫入端可能剛寫完結束標記才結束，由呼叫端再讀一次確認）
+    超過 idle_timeout 沒有新內容時直接拋出 ScanStreamError
+    """
+    try:
+        replaced = os.stat(path).st_ino != inode
+    except FileNotFoundError:
+        replaced = True
+    if replaced:
+        return f'讀取途中掃描結果被新的掃描取代: {path}'
+    if header and not _process_alive(header['pid']):
+        return f'掃描 process {header["pid"]} 已結束但沒有寫入結束標記（掃描中途失敗）'
+    if time.monotonic() - last_data > idle_timeout:
+        raise ScanStreamError(f'{idle_timeout:.0f} 秒沒有新的掃描結果，放棄等待: {path}')
+    return None
+
+
+def _wait_for_replacement(path: Path, inode: int, idle_timeout: float, poll_interval: float):
+    deadline = time.monotonic() + idle_timeout
+    while True:
+        try:
+            if os.stat(path).st_ino != inode:
+                return
+        except FileNotFoundError:
+            pass
+        if time.monotonic() > deadline:
+            raise ScanStreamError(f'等待 {idle_timeout:.0f} 秒仍沒有新的掃描開始: {path}')
+        time.sleep(poll_interval)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+跨 namespace 的原文去重
+「搜尋」「電話」「營業時間」這類文字在數十個頁面重複出現；正規化（空白、全形/半形標點）後相同的原文只送翻譯一次，
+譯文再展開回每個出現位置的 key（locale_table 的葉節點路徑）
+"""
+
+import re
+import unicodedata
+from typing import Dict
+
+_SPACE_RE = re.compile(r'\s+')
+
+def normalize_source(text: str) -> str:
+    """分組用的正規化：NFKC 把全形英數/標點轉成半形，連續空白合併為一個，去掉頭尾空白"""
+    return _SPACE_RE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+class SourceGroups:
+    """
+    依加入順序收集 (路徑, 原文)，每組以第一次出現的路徑為代表 key，送 API 時模型仍看得到出處
+    非字串的值不參與去重
+    """
+
+    def __init__(self):
+        self.unique: Dict[str, object] = {}  # {代表 key: 原文}
+        self._rep_of: Dict[str, str] = {}  # {路徑: 代表 key}，依加入順序
+        self._by_text: Dict[str, str] = {}
+
+    @property
+    def total(self) -> int:
+        return len(self._rep_of)
+
+    def add(self, path: str, text):
+        rep = path
+        if isinstance(text, str):
+            normalized = normalize_source(text)
+            existing = self._by_text.get(normalized)
+            if existing is not None:
+                self._rep_of[path] = existing
+                return
+            self._by_text[normalized] = rep
+        self.unique[rep] = text
+        self._rep_of[path] = rep
+
+    def fan_out(self, results: Dict[str, object]) -> Dict[str, object]:
+        """把 {代表 key: 譯文} 展開成 {路徑: 譯文}，順序與加入順序相同（寫回的 key 順序不變）"""
+        return {path: results[rep] for path, rep in self._rep_of.items() if rep in results}
+
+    def describe(self) -> str:
+        saved = self.total - len(self.unique)
+        return f'{self.total} 條 → {len(self.unique)} 條不重複原文（省下 {saved} 條）'
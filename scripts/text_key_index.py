@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+翻譯文字 → key 反向索引
+載入語系檔時建立一次，之後查詢現有 key 為 O(1)；新產生的 key 也即時加入，相同文字在不同頁面會得到同一個 key
+"""
+
+from typing import Dict, List, Optional
+
+from locale_table import iter_leaves
+
+
+def normalize_text(text: str) -> str:
+    return text.strip()
+
+
+class TextKeyIndex:
+    """{正規化文字: [key 路徑, ...]}，key 依語系檔中的順序排列，lookup 回傳第一個"""
+
+    def __init__(self):
+        self._keys: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_translations(cls, translations: dict) -> 'TextKeyIndex':
+        index = cls()
+        # 依語系檔順序（深度優先）走訪；t() 的 key 以 "." 直接串接，不跳脫
+        for parts, value in iter_leaves(translations):
+            if isinstance(value, str):
+                index.add('.'.join(parts), value)
+        return index
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key: str, text: str):
+        keys = self._keys.setdefault(normalize_text(text), [])
+        if key not in keys:
+            keys.append(key)
+
+    def lookup(self, text: str) -> Optional[str]:
+        keys = self._keys.get(normalize_text(text))
+        return keys[0] if keys else None
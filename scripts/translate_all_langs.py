@@ -1,11 +1,22 @@
 #!/usr/bin/env python3
 import os
 import json
-import urllib.request
-import time
-import re
+import argparse
+from collections import Counter
+from functools import partial
 from pathlib import Path
 
+from batch_planner import PART_SEP, DEFAULT_TOKEN_BUDGET, BatchPlanner, Estimate, estimate_tokens, missing_keys
+from batch_validator import brand_terms_prompt, validate_batch
+from forge_client import ForgeClient
+from llm_json import salvage_json_object
+from locale_table import LocaleTable, is_placeholder, namespace_of
+from rate_limiter import DEFAULT_BURST, DEFAULT_RATE, LIMITER, RetryExhausted
+from source_dedup import SourceGroups
+from translation_journal import TranslationJournal, drop_completed, replay_matching
+from translation_engine import DEFAULT_CONCURRENCY, plan_batches, run_jobs
+from translation_memory import TranslationMemory
+
 # 路徑設定
 LOCALE_DIR = Path("client/src/i18n/locales")
 MASTER_FILE = LOCALE_DIR / "zh-TW.json"
@@ -19,6 +30,25 @@ TARGET_LANGS = {
     "fr": "French (Elegant, Formal)"
 }
 
+# 翻譯模型與 prompt 版本（修改 prompt 時調升版本，翻譯記憶會自動失效）
+MODEL = "gemini-2.5-flash"
+PROMPT_VERSION = "matrix-v1"
+
+# 被拆開的長文，句子之間的接合字元（預設為空白）
+SENTENCE_JOINERS = {"zh-CN": "", "ja": ""}
+
+# 已完成批次的 journal（--resume 時重播）
+JOURNAL_FILE = Path("scripts/extracted/translate_all_langs.journal.jsonl")
+
+# 去重後的原文跨越所有頁面，批次以這個名稱代替頁面（標籤與 journal 使用）
+SHARED_PAGE = "*"
+
+# 輸出被截斷或請求失敗時重送的最多輪數
+MAX_ROUNDS = 3
+
+# 單一請求的讀取逾時秒數（逾時視為暫時性錯誤，交給 rate_limiter 重試）
+REQUEST_TIMEOUT = 120
+
 # 排除不需要翻譯的 Namespace (管理後台)
 IGNORE_NAMESPACES = [
     "admin",
@@ -55,116 +85,229 @@ if not API_KEY:
     print("❌ 錯誤：找不到 API Key")
     exit(1)
 
-def load_json(path):
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def save_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def clean_and_parse_json(content):
-    try:
-        return json.loads(content)
-    except:
-        match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", content, re.DOTALL)
-        if match:
-            return json.loads(match.group(1))
-        start, end = content.find('{'), content.rfind('}')
-        if start != -1 and end != -1:
-            return json.loads(content[start:end+1])
-        raise
-
-def call_llm(text_map, lang_instruction):
-    prompt = f"""You are a professional translator for "Apolnus" (High-end appliances).
-Translate Traditional Chinese to {lang_instruction}.
+SYSTEM_PROMPT = f"""You are a professional translator for "Apolnus" (High-end appliances).
+Translate Traditional Chinese to {{lang_instruction}}.
 
 RULES:
 1. Output VALID JSON ONLY. No markdown.
-2. Keep terms: "Apolnus", "Ultra S7", "One X", "SmartCasa".
+2. Keep terms: {brand_terms_prompt()}.
 3. Professional tone.
 """
+
+def call_llm(client, text_map, lang_instruction, label=""):
+    """回傳 (解析後的譯文, 輸出是否因長度上限被截斷)；429/5xx/逾時重試到上限仍失敗時拋出 RetryExhausted"""
+    prompt = SYSTEM_PROMPT.format(lang_instruction=lang_instruction)
     
     payload = {
-        "model": "gemini-2.5-flash",
+        "model": MODEL,
         "messages": [
             {"role": "system", "content": prompt},
             {"role": "user", "content": json.dumps(text_map, ensure_ascii=False)}
         ]
     }
     
-    req = urllib.request.Request(
-        API_URL,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={"Content-Type": "application/json", "Authorization": f"Bearer {API_KEY}"}
-    )
     try:
-        with urllib.request.urlopen(req) as response:
-            res = json.loads(response.read().decode('utf-8'))
-            return clean_and_parse_json(res['choices'][0]['message']['content'])
+        choice = LIMITER.call(client.post_json, payload, label=label).data['choices'][0]
+        parsed = salvage_json_object(choice['message']['content'])
+        if not parsed.complete:
+            # 截斷或格式錯誤：保留完整的項目，缺的 key 由呼叫端重送
+            missing = [k for k in text_map if k not in parsed.values]
+            print(f"🩹 {label}: 回應不完整，救回 {len(parsed.values)} 條，缺 {len(missing)} 條")
+        return parsed.values, choice.get('finish_reason') == 'length'
+    except RetryExhausted:
+        raise
     except Exception as e:
         print(f"⚠️ API Error: {e}")
-        return {}
+        return {}, False
+
+def translate_job(client, memory, journal, truncated_langs, job):
+    """
+    translation_engine 的工作單元（在 thread 中執行），逐項驗證後只把合格的譯文寫入翻譯記憶與 journal 並回傳
+    沒有回傳或不合格的 key 不在結果中，由呼叫端重新分批；請求本身失敗（重試用盡）時回傳 None，原封不動排入下一輪
+    輸出被截斷時把語言加入 truncated_langs，呼叫端據此縮小該語言的批次預算
+    """
+    try:
+        translated, truncated = call_llm(client, job.text_map, job.instruction, job.label)
+    except RetryExhausted as e:
+        print(f"⚠️ {job.label}: {e}")
+        return None
+    if truncated:
+        truncated_langs.add(job.lang)
+    check = validate_batch(job.text_map, translated)
+    if check.rejected or check.unexpected:
+        print(f"🔎 {job.label}: 剔除 {len(check.rejected)} 條 {check.describe()}")
+    if check.accepted and memory is not None:
+        memory.store_batch(job.lang, job.text_map, check.accepted)
+    if check.accepted and journal is not None:
+        journal.append(job.lang, job.page, check.accepted, job.text_map)
+    return check.accepted
 
 def main():
+    parser = argparse.ArgumentParser(description="多國語言矩陣翻譯")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"同時進行的 API 請求數（預設 {DEFAULT_CONCURRENCY}）")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"每秒最多送出的請求數（預設 {DEFAULT_RATE:g}，可用 FORGE_RATE_LIMIT 設定）")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST,
+                        help=f"可瞬間送出的請求數（預設 {DEFAULT_BURST}，可用 FORGE_RATE_BURST 設定）")
+    parser.add_argument("--no-memory", action="store_true", help="不使用翻譯記憶，全部送 API")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help=f"每個請求的 token 預算（預設 {DEFAULT_TOKEN_BUDGET}）")
+    parser.add_argument("--estimate", action="store_true", help="只輸出預估的請求數與 token 數，不呼叫 API")
+    parser.add_argument("--resume", action="store_true", help="重播上次中斷的 journal，已完成的批次不再送出")
+    args = parser.parse_args()
+    
     print("🚀 啟動多國語言矩陣翻譯...")
-    master_data = load_json(MASTER_FILE)
+    LIMITER.configure(args.rate, args.burst)
+    master_data = LocaleTable.load(MASTER_FILE)
+    memory = None if args.no_memory else TranslationMemory(MODEL, PROMPT_VERSION)
+    changed_langs = set()
+    
+    journal = None
+    replayed = {}
+    if not args.estimate:
+        journal = TranslationJournal(JOURNAL_FILE, {"model": MODEL, "prompt_version": PROMPT_VERSION, "dedup": True})
+        replayed = journal.open(resume=args.resume)
     
+    # 1. 規劃：每個語言收集所有頁面的缺漏，去重後裝箱，所有語言的批次攤平成一串工作
+    locale_data = {}
+    jobs = []
+    planners = {}
+    groups = {}
+    translated = {}
+    estimate = Estimate(0, 0, 0)
     for lang_code, instruction in TARGET_LANGS.items():
         target_file = LOCALE_DIR / f"{lang_code}.json"
         print(f"\n🌍 正在處理: {lang_code}...")
         
-        current_data = load_json(target_file)
+        current_data = LocaleTable.load(target_file)
+        locale_data[lang_code] = current_data
+        lang_groups = SourceGroups()
         
-        # 遍歷 Master 的第一層 Key (通常是 Page Name)
-        # 這樣可以避開 IGNORE_NAMESPACES
-        changes_made = False
-        
-        for page, content in master_data.items():
+        # 以葉節點為單位比對 Master（巢狀物件內的每一條文字各自補齊），並避開 IGNORE_NAMESPACES
+        missing_counts = Counter()
+        for path, text in master_data.items():
+            page = namespace_of(path)
             # 1. 檢查是否為排除的 Namespace (管理後台)
             if page in IGNORE_NAMESPACES or page.startswith("admin"):
                 continue
-                
-            # 2. 準備目標結構
-            if page not in current_data:
-                current_data[page] = {}
-            
-            # 3. 找出缺失的 Key
-            missing_map = {}
-            for key, text in content.items():
-                if key not in current_data[page] or (isinstance(current_data[page].get(key), str) and current_data[page].get(key).startswith("[EN]")):
-                    missing_map[key] = text
             
-            if not missing_map:
+            # 2. 找出缺失或仍是 [EN] 佔位符的葉節點
+            current = current_data.get(path)
+            if current is None or is_placeholder(current):
+                lang_groups.add(path, text)
+                missing_counts[page] += 1
+        
+        for page, count in missing_counts.items():
+            print(f"   📄 {page}: 補齊 {count} 條翻譯...")
+        
+        if not lang_groups.unique:
+            continue
+        groups[lang_code] = lang_groups
+        print(f"   🔗 去重：{lang_groups.describe()}")
+        
+        def apply(results):
+            for path, value in lang_groups.fan_out(results).items():
+                current_data.set(path, value)
+            changed_langs.add(lang_code)
+        
+        # journal 中上次已完成的結果直接套用；長文的片段留到規劃後再扣除
+        missing_map = lang_groups.unique
+        done = replayed.get((lang_code, SHARED_PAGE), {})
+        resumed = replay_matching(done, missing_map)
+        if resumed:
+            apply(resumed)
+            missing_map = {k: v for k, v in missing_map.items() if k not in resumed}
+            print(f"   ⏯️  journal 重播 {len(resumed)} 條")
+        
+        # 先查翻譯記憶，只有沒翻過的文字才送 API
+        if memory is not None and missing_map:
+            cached, missing_map = memory.lookup(lang_code, missing_map)
+            if cached:
+                apply(cached)
+                print(f"   ♻️  翻譯記憶命中 {len(cached)} 條")
+        if not missing_map:
+            continue
+        
+        # 依 token 預算裝箱（短文字合併、長文拆開）
+        planner = BatchPlanner(
+            args.token_budget,
+            prompt_tokens=estimate_tokens(SYSTEM_PROMPT.format(lang_instruction=instruction)),
+            joiner=SENTENCE_JOINERS.get(lang_code, " "),
+        )
+        planners[lang_code] = planner
+        batches = planner.plan(missing_map)
+        translated[lang_code] = replay_matching(done, {k: v for batch in batches for k, v in batch.items() if PART_SEP in k})
+        batches = drop_completed(batches, translated[lang_code])
+        estimate += planner.estimate(batches)
+        jobs.extend(plan_batches(lang_code, SHARED_PAGE, batches, instruction))
+    
+    print(f"\n📐 預估：{estimate.describe()}")
+    if args.estimate:
+        return
+    
+    # 2. 併發翻譯；請求失敗的批次原樣重送，缺少或不合格的項目重新分批後重送
+    # keep-alive 連線池，大小與實際的併發數相同
+    client = ForgeClient(API_URL, API_KEY, pool_size=max(1, args.concurrency), read_timeout=REQUEST_TIMEOUT)
+    round_no = 1
+    while jobs:
+        print(f"\n⚡ 第 {round_no} 輪：{len(jobs)} 個批次，併發數 {args.concurrency}")
+        truncated_langs = set()
+        results = run_jobs(jobs, partial(translate_job, client, memory, journal, truncated_langs), args.concurrency)
+        # 這一輪有輸出被截斷的語言縮小預算，其餘把預算逐步加回
+        for lang_code in {job.lang for job in jobs}:
+            if lang_code in truncated_langs:
+                planners[lang_code].shrink()
+            else:
+                planners[lang_code].grow()
+        
+        requeue = []
+        retry = {}
+        for job, result in zip(jobs, results):
+            if result is None:
+                requeue.append(job)
                 continue
-                
-            print(f"   📄 {page}: 補齊 {len(missing_map)} 條翻譯...")
-            
-            # 批次翻譯 (Batch Size 15)
-            BATCH_SIZE = 15
-            keys_list = list(missing_map.keys())
-            
-            for i in range(0, len(keys_list), BATCH_SIZE):
-                batch_keys = keys_list[i:i+BATCH_SIZE]
-                batch_input = {k: missing_map[k] for k in batch_keys}
-                
-                translated = call_llm(batch_input, instruction)
-                
-                if translated:
-                    for k, v in translated.items():
-                        if k in batch_input:
-                            current_data[page][k] = v
-                            changes_made = True
-                
-                time.sleep(1)
+            translated[job.lang].update(result)
+            missing = missing_keys(job.text_map, result)
+            if missing:
+                retry.setdefault(job.lang, {}).update(missing)
         
-        if changes_made:
-            save_json(target_file, current_data)
+        jobs = []
+        for job in requeue:
+            if round_no >= MAX_ROUNDS:
+                print(f"   ❌ {job.label}: 請求持續失敗，{len(job.text_map)} 條留待下次執行")
+                continue
+            jobs.append(job)
+        for lang_code, missing in retry.items():
+            planner = planners[lang_code]
+            if round_no >= MAX_ROUNDS:
+                print(f"   ❌ {lang_code}: {len(missing)} 條翻譯失敗，留待下次執行")
+                continue
+            jobs.extend(plan_batches(lang_code, SHARED_PAGE, planner.plan(missing), TARGET_LANGS[lang_code]))
+        round_no += 1
+    
+    # 3. 寫回（拆開的長文先接回），每條譯文展開到所有相同原文的 key
+    for lang_code, planner in planners.items():
+        merged = planner.merge_parts(translated[lang_code])
+        for path, value in groups[lang_code].fan_out(merged).items():
+            locale_data[lang_code].set(path, value)
+        if merged:
+            changed_langs.add(lang_code)
+    
+    for lang_code in TARGET_LANGS:
+        if lang_code in changed_langs:
+            locale_data[lang_code].save(LOCALE_DIR / f"{lang_code}.json")
             print(f"   ✅ {lang_code}.json 更新完成！")
         else:
             print(f"   ✅ {lang_code}.json 已是最新。")
+    # 結果都已寫回語系檔
+    journal.finish()
+    
+    print(f"\n🚦 API：{LIMITER.summary()}；{client.summary()}")
+    client.close()
+    if memory is not None:
+        print(f"\n♻️  翻譯記憶：命中 {memory.hits} 條，送出 API {memory.misses} 條")
+        memory.close()
 
 if __name__ == "__main__":
     main()
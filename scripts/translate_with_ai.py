@@ -5,10 +5,20 @@ AI 自動翻譯腳本
 """
 import os
 import json
-import urllib.request
-import time
+import urllib.error
+import argparse
+from collections import deque
 from pathlib import Path
 
+from batch_planner import DEFAULT_TOKEN_BUDGET, PART_SEP, BatchPlanner, missing_keys
+from batch_validator import brand_terms_prompt, validate_batch
+from forge_client import ForgeClient
+from llm_json import salvage_json_object
+from locale_table import LocaleTable
+from rate_limiter import DEFAULT_BURST, DEFAULT_RATE, LIMITER, RetryExhausted
+from translation_journal import TranslationJournal, drop_completed, replay_matching
+from translation_memory import TranslationMemory
+
 # 設定
 LOCALE_DIR = Path("client/src/i18n/locales")
 TARGET_FILE = LOCALE_DIR / "en.json"
@@ -16,6 +26,20 @@ BASE_URL = os.environ.get("BUILT_IN_FORGE_API_URL", "https://forge.manus.ai")
 API_URL = f"{BASE_URL}/v1/chat/completions" if not BASE_URL.endswith('/completions') else BASE_URL
 API_KEY = os.environ.get("BUILT_IN_FORGE_API_KEY") or os.environ.get("VITE_APP_ID")  # Fallback check
 
+# 翻譯模型與 prompt 版本（修改 prompt 時調升版本，翻譯記憶會自動失效）
+MODEL = "gemini-2.0-flash-exp"
+PROMPT_VERSION = "en-v2"
+TARGET_LANG = "en"
+# 已完成批次的 journal（--resume 時重播）
+JOURNAL_FILE = Path("scripts/extracted/translate_with_ai.journal.jsonl")
+# 單一請求的讀取逾時秒數；請求持續失敗的批次最多重新排隊幾次
+REQUEST_TIMEOUT = 120
+MAX_REQUEUES = 2
+# 缺少或驗證不合格的單一項目最多重送幾次
+MAX_KEY_RETRIES = 3
+# 固定 prompt（不含待翻譯 JSON）約佔的 token 數，只用於估算
+PROMPT_TOKENS = 130
+
 # 如果環境變數沒抓到，嘗試讀取 .env
 if not API_KEY:
     try:
@@ -31,14 +55,20 @@ if not API_KEY:
     print("❌ 錯誤：找不到 BUILT_IN_FORGE_API_KEY，無法進行 AI 翻譯")
     exit(1)
 
+# 逐批送出，一條 keep-alive 連線即可
+CLIENT = ForgeClient(API_URL, API_KEY, pool_size=1, read_timeout=REQUEST_TIMEOUT)
+
 def call_llm(text_map):
-    """調用 LLM API 進行翻譯"""
+    """
+    調用 LLM API 進行翻譯，回傳 (譯文, 輸出是否因長度上限被截斷)
+    429/5xx/逾時重試到上限仍失敗時拋出 RetryExhausted
+    """
     prompt = f"""You are a professional translator for a high-end home appliance brand "Apolnus".
 Translate the following Traditional Chinese texts to English.
 
 Requirements:
 1. Tone: Professional, Premium, Confident.
-2. Keep specific terms: "Apolnus", "Ultra S7", "One X".
+2. Keep specific terms: {brand_terms_prompt()}.
 3. Return ONLY a valid JSON object mapping the keys to the translated values.
 4. DO NOT include any explanation, just return the JSON object.
 
@@ -49,70 +79,54 @@ Output JSON (keys must match input keys exactly):
 """
     
     payload = {
-        "model": "gemini-2.0-flash-exp",
+        "model": MODEL,
         "messages": [
             {"role": "user", "content": prompt}
         ]
     }
     
-    req = urllib.request.Request(
-        API_URL,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {API_KEY}"
-        }
-    )
-    
     try:
         print(f"  → API URL: {API_URL}")
-        print(f"  → Payload size: {len(json.dumps(payload))} bytes")
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            content = result['choices'][0]['message']['content'].strip()
-            
-            # Try to extract JSON from markdown code blocks
-            if content.startswith('```'):
-                lines = content.split('\n')
-                content = '\n'.join(lines[1:-1])  # Remove first and last line (```json and ```)
-            
-            # Try to find JSON object in the content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx >= 0 and end_idx > start_idx:
-                content = content[start_idx:end_idx]
-            
-            return json.loads(content)
+        response = LIMITER.call(CLIENT.post_json, payload)
+        timing = response.timing
+        print(f"  → Payload size: {timing.sent_bytes} bytes，"
+              f"{'重用連線' if timing.reused else f'建立連線 {timing.connect:.2f}s'}，"
+              f"TTFB {timing.ttfb:.2f}s，共 {timing.total:.2f}s")
+        choice = response.data['choices'][0]
+        content = choice['message']['content']
+        truncated = choice.get('finish_reason') == 'length'
+        
+        # 容錯解析：code fence、前後說明文字、截斷的回應都保留完整的項目
+        parsed = salvage_json_object(content)
+        if not parsed.complete:
+            missing = [k for k in text_map if k not in parsed.values]
+            print(f"  🩹 回應不完整，救回 {len(parsed.values)} 條，缺: {', '.join(missing[:5])}"
+                  f"{' …' if len(missing) > 5 else ''}")
+        return parsed.values, truncated
     except urllib.error.HTTPError as e:
         print(f"⚠️ HTTP Error {e.code}: {e.reason}")
         print(f"  → Response: {e.read().decode('utf-8') if e.fp else 'No response body'}")
-        return {}
+        return {}, False
+    except RetryExhausted:
+        raise
     except Exception as e:
         print(f"⚠️ API 調用失敗: {e}")
         import traceback
         traceback.print_exc()
-        return {}
+        return {}, False
 
-def process_translations():
+def process_translations(token_budget=DEFAULT_TOKEN_BUDGET, estimate_only=False, resume=False):
     """處理翻譯"""
     print("🚀 開始 AI 自動翻譯 (zh-TW -> en)...")
     
-    with open(TARGET_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    table = LocaleTable.load(TARGET_FILE)
     
-    # 找出所有需要翻譯的項目 (遞迴搜尋)
-    tasks = {}
-    
-    def find_tasks(obj, path=""):
-        for k, v in obj.items():
-            curr_path = f"{path}.{k}" if path else k
-            if isinstance(v, dict):
-                find_tasks(v, curr_path)
-            elif isinstance(v, str) and v.startswith("[EN] "):
-                # 提取原始中文: "[EN] 產品介紹" -> "產品介紹"
-                tasks[curr_path] = v.replace("[EN] ", "")
-    
-    find_tasks(data)
+    # 找出所有需要翻譯的葉節點，提取原始中文: "[EN] 產品介紹" -> "產品介紹"
+    tasks = {
+        path: value.replace("[EN] ", "")
+        for path, value in table.items()
+        if isinstance(value, str) and value.startswith("[EN] ")
+    }
     total = len(tasks)
     print(f"📋 發現 {total} 個待翻譯項目")
     
@@ -120,34 +134,102 @@ def process_translations():
         print("✅ 沒有需要翻譯的項目")
         return
     
-    # 批次處理 (每批 5 個，避免 JSON 解析錯誤)
-    batch_size = 5
-    task_items = list(tasks.items())
+    # 先查翻譯記憶，只有沒翻過的文字才送 API
+    memory = TranslationMemory(MODEL, PROMPT_VERSION)
+    cached, tasks = memory.lookup(TARGET_LANG, tasks)
+    for key_path, translated_text in cached.items():
+        table.set(key_path, translated_text)
+    print(f"♻️  翻譯記憶命中 {len(cached)} 個項目，需送 API {len(tasks)} 個項目")
     
-    for i in range(0, total, batch_size):
-        batch = dict(task_items[i:i+batch_size])
-        print(f"🔄 處理批次 {i//batch_size + 1}/{(total + batch_size - 1)//batch_size} ({len(batch)} 個項目)...")
-        
-        translations = call_llm(batch)
-        
-        # 更新原始資料
-        for key_path, translated_text in translations.items():
-            # 更新 nested dict
-            keys = key_path.split('.')
-            target = data
-            for k in keys[:-1]:
-                target = target[k]
-            target[keys[-1]] = translated_text
-            print(f"  ✓ {key_path}")
-        
-        # 稍微延遲避免 Rate Limit
-        time.sleep(1)
+    # journal 中上次已完成的結果直接套用；長文的片段留到規劃後再扣除
+    journal = None
+    done = {}
+    if not estimate_only:
+        journal = TranslationJournal(JOURNAL_FILE, {"model": MODEL, "prompt_version": PROMPT_VERSION})
+        done = journal.open(resume=resume).get((TARGET_LANG, ""), {})
+    resumed = replay_matching(done, tasks)
+    for key_path, translated_text in resumed.items():
+        table.set(key_path, translated_text)
+    tasks = {k: v for k, v in tasks.items() if k not in resumed}
+    
+    # 依 token 預算裝箱，長文自動拆段
+    planner = BatchPlanner(token_budget, prompt_tokens=PROMPT_TOKENS)
+    batches = planner.plan(tasks)
+    translated_all = replay_matching(done, {k: v for batch in batches for k, v in batch.items() if PART_SEP in k})
+    queue = deque(drop_completed(batches, translated_all))
+    print(f"📐 預估 {planner.estimate(queue).describe()}")
+    if estimate_only:
+        memory.close()
+        return
+
+    attempts = {}  # 各 key 因缺少或不合格而重送的次數
+    failures = {}  # 請求失敗的批次（以第一個 key 識別）已重新排隊的次數
+    sent = 0
+    while queue:
+        batch = queue.popleft()
+        sent += 1
+        print(f"🔄 處理批次 {sent}/{sent + len(queue)} ({len(batch)} 個項目)...")
+
+        try:
+            translations, truncated = call_llm(batch)
+        except RetryExhausted as e:
+            # 請求本身失敗：排回佇列尾端，等其他批次跑完再試，不丟棄
+            first = next(iter(batch))
+            failures[first] = failures.get(first, 0) + 1
+            if failures[first] <= MAX_REQUEUES:
+                print(f"  ⚠️ {e}，批次排回佇列")
+                queue.append(batch)
+            else:
+                print(f"  ❌ {e}，{len(batch)} 個項目留待下次執行")
+            continue
+        # 逐項驗證，只保留合格的譯文（模型自創的 key path 也在這裡擋掉，寫回時不會 KeyError）
+        check = validate_batch(batch, translations)
+        if check.rejected or check.unexpected:
+            print(f"  🔎 剔除 {len(check.rejected)} 條 {check.describe()}")
+        memory.store_batch(TARGET_LANG, batch, check.accepted)
+        journal.append(TARGET_LANG, "", check.accepted, batch)
+        translated_all.update(check.accepted)
+
+        # 輸出被截斷才縮小預算；沒有截斷的批次把預算逐步加回
+        if truncated:
+            planner.shrink()
+        else:
+            planner.grow()
+        # 只有缺少或不合格的項目重送：依目前的預算重新規劃後排回佇列前端
+        missing = missing_keys(batch, check.accepted)
+        for key in missing:
+            attempts[key] = attempts.get(key, 0) + 1
+        retry = {k: v for k, v in missing.items() if attempts[k] <= MAX_KEY_RETRIES}
+        if retry:
+            queue.extendleft(reversed(planner.plan(retry)))
+        if len(retry) < len(missing):
+            print(f"  ⚠️ {len(missing) - len(retry)} 個項目重送 {MAX_KEY_RETRIES} 次仍未取得譯文，留待下次執行")
+
+    # 更新原始資料（拆開的長文先接回）
+    for key_path, translated_text in planner.merge_parts(translated_all).items():
+        table.set(key_path, translated_text)
+        print(f"  ✓ {key_path}")
+    
+    print(f"🚦 API：{LIMITER.summary()}；{CLIENT.summary()}")
+    CLIENT.close()
     
     # 寫回檔案
-    with open(TARGET_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    table.save(TARGET_FILE)
+    journal.finish()
+    memory.close()
     
     print(f"✅ 翻譯完成！{total} 個項目已更新到 en.json")
 
 if __name__ == "__main__":
-    process_translations()
+    parser = argparse.ArgumentParser(description="AI 自動翻譯 en.json 中的 [EN] 佔位符")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help=f"每個請求的 token 上限（預設 {DEFAULT_TOKEN_BUDGET}）")
+    parser.add_argument("--estimate", action="store_true", help="只估算請求數與 token 用量，不呼叫 API")
+    parser.add_argument("--resume", action="store_true", help="重播上次中斷的 journal，已完成的批次不再送出")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"每秒最多送出的請求數（預設 {DEFAULT_RATE:g}，可用 FORGE_RATE_LIMIT 設定）")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST,
+                        help=f"可瞬間送出的請求數（預設 {DEFAULT_BURST}，可用 FORGE_RATE_BURST 設定）")
+    args = parser.parse_args()
+    LIMITER.configure(args.rate, args.burst)
+    process_translations(args.token_budget, args.estimate, args.resume)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+非同步翻譯執行器
+把所有語言 × 頁面 × 批次攤平成一串工作，以 asyncio 併發送出（上限由 Semaphore 控制）
+阻塞式的 API 呼叫交給大小等於併發數的 ThreadPoolExecutor（預設 executor 最多 min(32, CPU+4) 條執行緒），結果一律依工作清單順序回傳，寫入順序與單執行緒執行相同
+請求速率由 rate_limiter 控制，這裡只限制同時進行中的請求數
+translate 會在多個 thread 中同時執行，共用的 ForgeClient、RateLimiter、TranslationMemory、TranslationJournal 都以 lock 保護內部狀態
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+DEFAULT_CONCURRENCY = 8
+
+
+class TranslationJob(NamedTuple):
+    lang: str
+    page: str
+    batch_index: int  # 頁面內第幾批（從 1 開始）
+    batch_count: int
+    text_map: Dict[str, str]
+    instruction: str
+
+    @property
+    def label(self) -> str:
+        return f'{self.lang}/{self.page} [{self.batch_index}/{self.batch_count}]'
+
+
+def plan_batches(lang: str, page: str, batches: List[Dict[str, str]], instruction: str) -> List[TranslationJob]:
+    """把一個頁面的批次（batch_planner.BatchPlanner.plan 的結果）包成工作"""
+    return [
+        TranslationJob(lang, page, i, len(batches), batch, instruction)
+        for i, batch in enumerate(batches, 1)
+    ]
+
+
+async def _run_all(jobs: Sequence[TranslationJob], translate: Callable[[TranslationJob], Optional[dict]],
+                   concurrency: int) -> List[Optional[dict]]:
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='translate') as executor:
+        async def run_one(job: TranslationJob) -> Optional[dict]:
+            nonlocal done
+            async with semaphore:
+                start = time.perf_counter()
+                result = await loop.run_in_executor(executor, translate, job)
+                done += 1
+                status = '✓' if result else '✗'
+                print(f'   {status} {job.label} ({time.perf_counter() - start:.1f}s, {done}/{len(jobs)})')
+                return result
+
+        return await asyncio.gather(*(run_one(job) for job in jobs))
+
+
+def run_jobs(jobs: Sequence[TranslationJob], translate: Callable[[TranslationJob], Optional[dict]],
+             concurrency: int = DEFAULT_CONCURRENCY) -> List[Optional[dict]]:
+    """併發執行所有工作，回傳與 jobs 同順序的結果"""
+    if not jobs:
+        return []
+    return asyncio.run(_run_all(jobs, translate, concurrency))
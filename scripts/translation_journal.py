@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+翻譯批次的 append-only journal
+每個批次拿到結果就以一行 JSON 附加到 journal 並 fsync，中斷（crash / Ctrl-C）時已付費的結果不會遺失
+--resume 時先重播 journal，已完成的 key（包含長文拆開的片段）不再送 API；整個執行成功寫回語系檔後刪除 journal
+每條結果同時記錄原文的 hash，原文在中斷後被修改（或長文拆法不同）的 key 不沿用舊譯文
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+JOURNAL_VERSION = 2
+
+Scope = Tuple[str, str]  # (語言, 頁面)
+
+
+class JournalEntry(NamedTuple):
+    text: str  # 譯文
+    source: str  # 原文的 source_hash
+
+
+def source_hash(text) -> str:
+    if not isinstance(text, str):
+        text = json.dumps(text, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class TranslationJournal:
+    """
+    第一行記錄執行設定（模型、prompt 版本），設定不同的 journal 不會被重播
+    append 以 lock 串行寫入，可在多個 thread 中共用
+    """
+
+    def __init__(self, path, meta: dict):
+        self.path = Path(path)
+        self.meta = dict(meta, version=JOURNAL_VERSION)
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _read(self) -> Dict[Scope, Dict[str, JournalEntry]]:
+        done: Dict[Scope, Dict[str, JournalEntry]] = {}
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            lines = f.readlines()
+        for i, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 寫到一半中斷的最後一行，截掉後從這裡繼續附加
+                break
+            if i == 0:
+                if record.get('meta') != self.meta:
+                    print(f'⚠️  {self.path} 的執行設定不同（{record.get("meta")}），不重播')
+                    return {}
+            else:
+                sources = record['sources']
+                done.setdefault((record['lang'], record['page']), {}).update(
+                    (key, JournalEntry(text, sources[key])) for key, text in record['results'].items()
+                )
+                self.replayed += len(record['results'])
+            valid_bytes += len(line)
+        if valid_bytes < sum(len(line) for line in lines):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return done
+
+    def open(self, resume: bool = False) -> Dict[Scope, Dict[str, JournalEntry]]:
+        """
+        開啟 journal；resume 時回傳重播的 {(語言, 頁面): {key: JournalEntry}}，否則清空舊 journal
+        以 replay_matching 取出原文沒有改變的譯文
+        """
+        done = {}
+        if resume and self.path.exists():
+            done = self._read()
+            if done:
+                print(f'⏯️  從 {self.path} 重播 {self.replayed} 條已完成的翻譯')
+        elif self.path.exists() and self.path.stat().st_size:
+            print(f'🗑️  捨棄上次未完成的 journal {self.path}（要接續請加 --resume）')
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if done:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._write({'meta': self.meta})
+        return done
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, lang: str, page: str, results: Dict[str, str], sources: Dict[str, str]):
+        """記錄一個批次的結果（sources 為批次的 {key: 原文}），寫入磁碟後才返回"""
+        if not results:
+            return
+        hashes = {key: source_hash(sources[key]) for key in results}
+        with self._lock:
+            self._write({'lang': lang, 'page': page, 'results': results, 'sources': hashes})
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def finish(self):
+        """結果已寫回語系檔，journal 不再需要"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+
+def replay_matching(done: Dict[str, JournalEntry], sources: Dict[str, str]) -> Dict[str, str]:
+    """{key: 譯文}，只取 sources 中原文與記錄時相同的 key"""
+    return {
+        key: done[key].text
+        for key, text in sources.items()
+        if key in done and done[key].source == source_hash(text)
+    }
+
+
+def drop_completed(batches: List[Dict[str, str]], done: Dict[str, str]) -> List[Dict[str, str]]:
+    """從規劃好的批次中移除 journal 已有結果的 key（例如長文拆開後已完成的片段）"""
+    remaining = []
+    for batch in batches:
+        batch = {key: text for key, text in batch.items() if key not in done}
+        if batch:
+            remaining.append(batch)
+    return remaining
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+翻譯記憶（SQLite）
+以「原文指紋 + 目標語言 + 模型 + prompt 版本」為 key 保存 LLM 的翻譯結果
+呼叫 API 前先查詢，拿到結果立即寫入；中斷後重跑、key 重新產生、不同 namespace 的重複文字都會直接命中
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+DEFAULT_MEMORY_FILE = Path('scripts/extracted/translation_memory.sqlite3')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS memory (
+    fingerprint TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (fingerprint, lang, model, prompt_version)
+)
+'''
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+
+class TranslationMemory:
+    """
+    一個實例對應一組 (model, prompt_version)，目標語言在查詢時指定
+    sqlite 連線不綁定 thread，所有查詢與寫入以同一把 lock 串行化，可在多個 thread 中共用
+    """
+
+    def __init__(self, model: str, prompt_version: str, path=DEFAULT_MEMORY_FILE):
+        self.path = Path(path)
+        self.model = model
+        self.prompt_version = prompt_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def lookup(self, lang: str, text_map: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """把 {key: 原文} 拆成 (命中的 {key: 譯文}, 尚未翻譯的 {key: 原文})"""
+        # 只有字串會進翻譯記憶，巢狀物件一律視為未翻譯
+        prints = {key: fingerprint(text) for key, text in text_map.items() if isinstance(text, str)}
+        unique = list(set(prints.values()))
+        found = {}
+        with self._lock:
+            # SQLite 參數數量有上限，分段查詢
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                rows = self._conn.execute(
+                    'SELECT fingerprint, target FROM memory WHERE lang = ? AND model = ? AND prompt_version = ? '
+                    f'AND fingerprint IN ({",".join("?" * len(chunk))})',
+                    (lang, self.model, self.prompt_version, *chunk),
+                )
+                found.update(rows)
+
+        cached, missing = {}, {}
+        for key, text in text_map.items():
+            if prints.get(key) in found:
+                cached[key] = found[prints[key]]
+            else:
+                missing[key] = text
+        with self._lock:
+            self.hits += len(cached)
+            self.misses += len(missing)
+        return cached, missing
+
+    def store(self, lang: str, pairs: Iterable[Tuple[str, str]]):
+        """寫入 (原文, 譯文)，立即 commit"""
+        now = time.time()
+        rows = [
+            (fingerprint(source), lang, self.model, self.prompt_version, source, target, now)
+            for source, target in pairs
+            if isinstance(source, str) and isinstance(target, str) and target
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO memory VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self._conn.commit()
+
+    def store_batch(self, lang: str, text_map: Dict[str, str], translated: Dict[str, str]):
+        """依 key 對應原文與 API 回傳的譯文（只保存請求中有的 key）"""
+        self.store(lang, [(text_map[key], value) for key, value in translated.items() if key in text_map])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -2,14 +2,17 @@
 import os
 import re
 import json
-import hashlib
 from pathlib import Path
 
+from atomic_output import STATS, write_json_if_changed, write_text_if_changed
+from key_allocator import KeyAllocator
+
 # 設定路徑
 BASE_DIR = Path("client/src")
 PAGES_DIR = BASE_DIR / "pages"
 LOCALE_PATH = BASE_DIR / "i18n/locales/zh-TW.json"
 EN_LOCALE_PATH = BASE_DIR / "i18n/locales/en.json"
+KEY_REGISTRY_PATH = Path("scripts/extracted/key_registry.json")
 
 # 排除名單 (保護資料結構與特定語法)
 EXCLUDE_PATTERNS = [
@@ -34,14 +37,18 @@ def load_json(path):
 zh_data = load_json(LOCALE_PATH)
 en_data = load_json(EN_LOCALE_PATH)
 
+# key 配置器：同一段文字永遠得到同一個 key，撞號時自動延長 hash
+key_allocator = KeyAllocator(KEY_REGISTRY_PATH).load()
+key_allocator.seed(zh_data)
+
 def get_page_key(filename):
     # AdminSubscribers.tsx -> adminSubscribers
     name = filename.replace(".tsx", "")
     return name[0].lower() + name[1:]
 
-def generate_hash_key(text):
-    # 生成短 Hash
-    return "t_" + hashlib.md5(text.encode("utf-8")).hexdigest()[:8]
+def generate_hash_key(text, page_key):
+    # 生成短 Hash（t_ + md5 前 8 碼，衝突時延長）
+    return key_allocator.allocate(page_key, text)
 
 def process_file(file_path):
     with open(file_path, "r", encoding="utf-8") as f:
@@ -94,7 +101,7 @@ def process_file(file_path):
             return match.group(0)
         
         # 檢查是否已存在 (避免重複生成)
-        key = generate_hash_key(text)
+        key = generate_hash_key(text, page_key)
         full_key = f"{page_key}.{key}"
         
         # 寫入字典
@@ -114,7 +121,7 @@ def process_file(file_path):
         if not re.search(r"[\u4e00-\u9fff]", text):
             return match.group(0)
         
-        key = generate_hash_key(text)
+        key = generate_hash_key(text, page_key)
         full_key = f"{page_key}.{key}"
         
         zh_data[page_key][key] = text.strip()
@@ -125,11 +132,9 @@ def process_file(file_path):
     
     content = re.sub(r'([a-zA-Z-]+)="([^"]*?[\u4e00-\u9fff]+[^"]*?)"', replace_attr, content)
     
-    # 寫回檔案
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content)
-    
-    print(f"✅ Processed: {file_path.name}")
+    # 寫回檔案（內容沒變時不寫入）
+    if write_text_if_changed(file_path, content):
+        print(f"✅ Processed: {file_path.name}")
 
 # 執行遍歷
 print("🚀 Starting Universal Fixer...")
@@ -139,11 +144,13 @@ for root, dirs, files in os.walk(PAGES_DIR):
             process_file(Path(root) / file)
 
 # 寫回字典
-with open(LOCALE_PATH, "w", encoding="utf-8") as f:
-    json.dump(zh_data, f, ensure_ascii=False, indent=2)
-with open(EN_LOCALE_PATH, "w", encoding="utf-8") as f:
-    json.dump(en_data, f, ensure_ascii=False, indent=2)
+write_json_if_changed(LOCALE_PATH, zh_data)
+write_json_if_changed(EN_LOCALE_PATH, en_data)
+
+key_allocator.save()
 
 print("💾 Dictionaries Updated!")
+print(STATS.summary())
 print(f"📊 Total pages processed: {len(zh_data)}")
 print(f"📊 Total translation keys: {sum(len(v) if isinstance(v, dict) else 0 for v in zh_data.values())}")
+print(f"📊 Key collisions resolved: {key_allocator.collisions}")
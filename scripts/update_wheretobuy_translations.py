@@ -3,22 +3,21 @@
 更新 whereToBuy 翻譯，添加所有缺少的 key
 """
 
-import json
 from pathlib import Path
 
+from atomic_output import STATS
+from locale_table import LocaleTable
+
 # 文件路徑
 ZH_TW_FILE = Path('/home/ubuntu/apolnus/client/src/i18n/locales/zh-TW.json')
 EN_FILE = Path('/home/ubuntu/apolnus/client/src/i18n/locales/en.json')
 
 # 讀取現有翻譯
-with open(ZH_TW_FILE, 'r', encoding='utf-8') as f:
-    zh_tw = json.load(f)
-
-with open(EN_FILE, 'r', encoding='utf-8') as f:
-    en = json.load(f)
+zh_tw = LocaleTable.load(ZH_TW_FILE)
+en = LocaleTable.load(EN_FILE)
 
 # 完整的 whereToBuy 翻譯
-zh_tw['whereToBuy'] = {
+WHERE_TO_BUY_ZH = {
     "title": "購買通路",
     "subtitle": "選擇您喜歡的購買方式",
     "tabs": {
@@ -62,7 +61,7 @@ zh_tw['whereToBuy'] = {
     }
 }
 
-en['whereToBuy'] = {
+WHERE_TO_BUY_EN = {
     "title": "Where to Buy",
     "subtitle": "Choose your preferred purchase method",
     "tabs": {
@@ -106,13 +105,15 @@ en['whereToBuy'] = {
     }
 }
 
-# 保存更新後的翻譯
-with open(ZH_TW_FILE, 'w', encoding='utf-8') as f:
-    json.dump(zh_tw, f, ensure_ascii=False, indent=2)
+# 以葉節點合併：補上缺少的 key、更新變動的文字，語系檔中其他 whereToBuy key 保留
+zh_diff = zh_tw.merge('whereToBuy', WHERE_TO_BUY_ZH)
+en_diff = en.merge('whereToBuy', WHERE_TO_BUY_EN)
 
-with open(EN_FILE, 'w', encoding='utf-8') as f:
-    json.dump(en, f, ensure_ascii=False, indent=2)
+# 保存更新後的翻譯
+zh_tw.save(ZH_TW_FILE)
+en.save(EN_FILE)
 
 print("✅ whereToBuy 翻譯已更新")
-print(f"   zh-TW keys: {list(zh_tw['whereToBuy'].keys())}")
-print(f"   en keys: {list(en['whereToBuy'].keys())}")
+print(STATS.summary())
+print(f"   zh-TW: {zh_diff.describe()}")
+print(f"   en: {en_diff.describe()}")